@@ -0,0 +1,26 @@
+"""Непрозрачные курсоры keyset-пагинации API.
+
+Курсор — части ключа последней записи страницы через ``:`` в
+base64url без выравнивания. Клиенту он ничего не говорит, а разбор
+испорченного курсора даёт ValueError.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+
+def encode(*parts):
+    raw = ':'.join(str(part) for part in parts).encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode(cursor, count):
+    """``count`` строковых частей курсора."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        raw = urlsafe_b64decode(padded.encode()).decode()
+    except ValueError:
+        # Сюда же попадают binascii.Error и UnicodeDecodeError.
+        raise ValueError(cursor)
+    parts = raw.split(':', count - 1)
+    if len(parts) != count:
+        raise ValueError(cursor)
+    return parts
@@ -0,0 +1,57 @@
+"""Сериализация ответов API из ``values()``.
+
+Ресурс описывает поля ответа как поиски ORM (``author__username``)
+или выражения. Выборка строится одним ``values()`` с нужными
+соединениями: без экземпляров моделей, ``select_related`` и
+обхода связей в Python. Параметр ``fields=`` сужает и выборку, и
+ответ.
+"""
+from django.conf import settings
+from django.db.models import F
+
+
+def media_url(name):
+    return settings.MEDIA_URL + name if name else None
+
+
+class Resource:
+    def __init__(self, fields, converters=None):
+        self.fields = fields
+        self.converters = converters or {}
+
+    def parse(self, value):
+        """Имена полей из ``fields=``; ValueError на неизвестных."""
+        if not value:
+            return tuple(self.fields)
+        names = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        if not names or any(name not in self.fields for name in names):
+            raise ValueError(value)
+        return names
+
+    def key(self, name):
+        # Имена вроде ``author`` заняты полями модели, поэтому выражения
+        # получают свой префикс.
+        return name if self.fields[name] == name else f'api_{name}'
+
+    def values(self, queryset, names, extra=()):
+        """``values()`` полей ``names`` и служебных полей ``extra``."""
+        plain = [name for name in names if self.key(name) == name]
+        aliased = {
+            self.key(name): (
+                F(self.fields[name]) if isinstance(self.fields[name], str)
+                else self.fields[name]
+            )
+            for name in names if self.key(name) != name
+        }
+        plain.extend(field for field in extra if field not in plain)
+        return queryset.values(*plain, **aliased)
+
+    def dump(self, row, names):
+        result = {}
+        for name in names:
+            value = row[self.key(name)]
+            converter = self.converters.get(name)
+            result[name] = converter(value) if converter else value
+        return result
@@ -0,0 +1,169 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_posts, restore_post
+from posts.comments import save_comment
+from posts.models import ArchivedPost, Comment, Follow, Group, Post
+
+from .. import cursors
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        now = timezone.now()
+        for i in range(5):
+            post = Post.objects.create(
+                author=cls.author, text=f'Пост {i}',
+                group=cls.group if i % 2 else None,
+            )
+            # Два поста с одинаковой датой проверяют ключ (pub_date, id).
+            moment = now - timedelta(days=400 * (i > 2), minutes=i // 2)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=moment, updated=moment
+            )
+        list(archive_posts(now - timedelta(days=365)))
+        cls.post = Post.objects.order_by('-pub_date', '-pk').first()
+
+    def walk(self, url, **params):
+        """Все страницы списка по ссылкам next."""
+        results = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            results.extend(data['results'])
+            if not data['next']:
+                return results
+            response = self.client.get(data['next'])
+
+    def test_posts_cursor_walks_hot_then_archive(self):
+        results = self.walk(reverse('api:post_list'), limit=2)
+        self.assertEqual(
+            [post['text'] for post in results],
+            ['Пост 1', 'Пост 0', 'Пост 2', 'Пост 3', 'Пост 4'],
+        )
+        self.assertEqual(results[0]['author'], 'author')
+        self.assertEqual(results[0]['group'], 'group')
+        self.assertIsNone(results[1]['group'])
+
+    def test_restored_post_keeps_its_place(self):
+        restore_post(ArchivedPost.objects.get(text='Пост 4'))
+        results = self.walk(reverse('api:post_list'), limit=2)
+        self.assertEqual(
+            [post['text'] for post in results],
+            ['Пост 1', 'Пост 0', 'Пост 2', 'Пост 3', 'Пост 4'],
+        )
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse('api:post_list'), {'fields': 'id,author', 'limit': 1}
+        )
+        self.assertEqual(
+            response.json()['results'],
+            [{'id': self.post.pk, 'author': 'author'}],
+        )
+
+    def test_post_list_is_one_query_per_tier(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('api:post_list'), {'limit': 2})
+
+    def test_filters(self):
+        results = self.walk(reverse('api:post_list'), group='group')
+        self.assertEqual(
+            [post['text'] for post in results], ['Пост 1', 'Пост 3']
+        )
+
+    def test_post_detail_reads_archive(self):
+        response = self.client.get(
+            reverse('api:post_detail', args=[self.post.pk])
+        )
+        self.assertEqual(response.json()['text'], 'Пост 1')
+        archived = ArchivedPost.objects.get(text='Пост 4')
+        response = self.client.get(
+            reverse('api:post_detail', args=[archived.pk])
+        )
+        self.assertEqual(response.json()['text'], 'Пост 4')
+        response = self.client.get(reverse('api:post_detail', args=[999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
+
+    def test_comments(self):
+        root = save_comment(
+            Comment(post=self.post, author=self.reader, text='Корень'), None
+        )
+        save_comment(
+            Comment(post=self.post, author=self.author, text='Ответ'), root
+        )
+        response = self.client.get(
+            reverse('api:post_comments', args=[self.post.pk]),
+            {'fields': 'text,parent,depth'},
+        )
+        self.assertEqual(response.json()['results'], [
+            {'text': 'Корень', 'parent': None, 'depth': 0},
+            {'text': 'Ответ', 'parent': root.pk, 'depth': 1},
+        ])
+
+    def test_comment_limit_counts_replies(self):
+        root = save_comment(
+            Comment(post=self.post, author=self.reader, text='Корень'), None
+        )
+        save_comment(
+            Comment(post=self.post, author=self.author, text='Ответ'), root
+        )
+        url = reverse('api:post_comments', args=[self.post.pk])
+        page = self.client.get(url, {'fields': 'text', 'limit': 1}).json()
+        self.assertEqual(page['results'], [{'text': 'Корень'}])
+        self.assertEqual(
+            self.walk(url, fields='text', limit=1),
+            [{'text': 'Корень'}, {'text': 'Ответ'}],
+        )
+
+    def test_groups_and_profile(self):
+        response = self.client.get(reverse('api:group_list'))
+        self.assertEqual(response.json()['results'], [
+            {'slug': 'group', 'title': 'Группа', 'description': 'Описание'}
+        ])
+        response = self.client.get(
+            reverse('api:profile_detail', args=['author'])
+        )
+        self.assertEqual(response.json(), {
+            'username': 'author', 'first_name': 'Лев',
+            'last_name': 'Толстой', 'posts': 5, 'followers': 1,
+            'following': 0,
+        })
+
+    def test_bad_requests(self):
+        url = reverse('api:post_list')
+        for params in (
+            {'fields': 'id,password'}, {'limit': 0}, {'limit': 'x'},
+            {'cursor': 'garbage'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post(url).status_code, 405)
+
+    def test_out_of_range_cursor(self):
+        for parts in (('9' * 30, 1), (1, '9' * 30), (1, 2 ** 63),
+                      ('²', 1)):
+            with self.subTest(parts=parts):
+                response = self.client.get(
+                    reverse('api:post_list'),
+                    {'cursor': cursors.encode(*parts)},
+                )
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,272 @@
+"""Версионированный JSON API только для чтения.
+
+Списки листаются непрозрачными курсорами (``cursor=``) по ключу
+сортировки, а не номером страницы: глубокие страницы стоят столько
+же, сколько первая. ``fields=`` выбирает поля ответа, ``limit=`` —
+размер страницы до ``API_MAX_PAGE_SIZE``.
+"""
+import heapq
+import re
+from datetime import timedelta
+from functools import wraps
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from posts.archive import get_post
+from posts.comments import EPOCH, comment_range, visible
+from posts.models import ArchivedPost, Follow, Group, Post, User
+
+from . import cursors
+from .serializers import Resource, media_url
+
+
+def related_count(queryset, field):
+    """Подзапрос с числом строк ``queryset``, ссылающихся на запись."""
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by()
+    counts = counts.values(field).annotate(total=Count('pk'))
+    return Coalesce(
+        Subquery(counts.values('total'), output_field=IntegerField()), 0
+    )
+
+
+POSTS = Resource({
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'comment_count': 'comment_count',
+    'image': 'image',
+}, converters={'image': media_url})
+
+COMMENTS = Resource({
+    'id': 'id',
+    'post': 'post_id',
+    'parent': 'parent_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+    'depth': 'depth',
+})
+
+GROUPS = Resource({
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+})
+
+PROFILES = Resource({
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'posts': (
+        related_count(Post.objects.filter(is_hidden=False), 'author')
+        + related_count(ArchivedPost.objects.filter(is_hidden=False),
+                        'author')
+    ),
+    'followers': related_count(Follow.objects.all(), 'author'),
+    'following': related_count(Follow.objects.all(), 'user'),
+})
+
+_MOMENT = re.compile(r'[0-9]{1,17}')
+_ID = re.compile(r'[0-9]{1,19}')
+
+# Горячая таблица и архив, см. posts.archive.TieredPostList.
+POST_TIERS = (Post, ArchivedPost)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def api_view(view):
+    """GET-view API: ошибки запроса и 404 отдаются в JSON."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as error:
+            return json_response({'detail': str(error)}, status=400)
+        except Http404:
+            return json_response({'detail': 'Не найдено.'}, status=404)
+    return wrapper
+
+
+def fields_param(request, resource):
+    try:
+        return resource.parse(request.GET.get('fields'))
+    except ValueError:
+        raise BadRequest(
+            'Доступные поля: ' + ', '.join(resource.fields) + '.'
+        )
+
+
+def limit_param(request):
+    limit = request.GET.get('limit', settings.API_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= settings.API_MAX_PAGE_SIZE:
+        raise BadRequest(
+            f'limit — число от 1 до {settings.API_MAX_PAGE_SIZE}.'
+        )
+    return limit
+
+
+def decode_cursor(cursor, count):
+    try:
+        return cursors.decode(cursor, count)
+    except ValueError:
+        raise BadRequest('Неверный курсор.')
+
+
+def page_response(request, results, next_cursor):
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = f'{request.path}?{params.urlencode()}'
+    return json_response({'results': results, 'next': next_url})
+
+
+def stamp(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def post_cursor(cursor):
+    moment, pk = decode_cursor(cursor, 2)
+    # Границы не дают переполнить datetime и INTEGER SQLite.
+    if (
+        not _MOMENT.fullmatch(moment) or not _ID.fullmatch(pk)
+        or int(pk) >= 2 ** 63
+    ):
+        raise BadRequest('Неверный курсор.')
+    return EPOCH + timedelta(microseconds=int(moment)), int(pk)
+
+
+def post_key(row):
+    return row['pub_date'], row['id']
+
+
+def post_page(filters, names, limit, cursor=None):
+    """Посты по ``(-pub_date, -id)`` после курсора из обеих таблиц.
+
+    Из каждой читается не больше ``limit + 1`` строк, и они сливаются:
+    возвращённый из архива пост бывает старше архивных.
+    """
+    moment, pk = post_cursor(cursor) if cursor else (None, None)
+    tiers = []
+    for model in POST_TIERS:
+        queryset = model.objects.filter(is_hidden=False, **filters)
+        if moment is not None:
+            queryset = queryset.filter(
+                Q(pub_date__lt=moment) | Q(pub_date=moment, pk__lt=pk)
+            )
+        queryset = POSTS.values(
+            queryset.order_by('-pub_date', '-pk'), names,
+            extra=('id', 'pub_date'),
+        )
+        tiers.append(queryset[:limit + 1])
+    rows = list(islice(
+        heapq.merge(*tiers, key=post_key, reverse=True), limit + 1
+    ))
+    next_cursor = None
+    if len(rows) > limit:
+        row = rows[limit - 1]
+        next_cursor = cursors.encode(stamp(row['pub_date']), row['id'])
+    return [POSTS.dump(row, names) for row in rows[:limit]], next_cursor
+
+
+@api_view
+def post_list(request):
+    filters = {}
+    if request.GET.get('group'):
+        filters['group__slug'] = request.GET['group']
+    if request.GET.get('author'):
+        filters['author__username'] = request.GET['author']
+    results, next_cursor = post_page(
+        filters, fields_param(request, POSTS), limit_param(request),
+        request.GET.get('cursor'),
+    )
+    return page_response(request, results, next_cursor)
+
+
+@api_view
+def post_detail(request, post_id):
+    names = fields_param(request, POSTS)
+    for model in POST_TIERS:
+        row = POSTS.values(
+            model.objects.filter(pk=post_id, is_hidden=False), names
+        ).first()
+        if row is not None:
+            return json_response(POSTS.dump(row, names))
+    raise Http404
+
+
+@api_view
+def post_comments(request, post_id):
+    names = fields_param(request, COMMENTS)
+    post = get_post(post_id)
+    try:
+        comments, next_cursor = comment_range(
+            post, request.GET.get('cursor'), limit_param(request)
+        )
+    except ValueError:
+        raise BadRequest('Неверный курсор.')
+    rows = COMMENTS.values(comments, names, extra=('path', 'is_hidden'))
+    results = [
+        COMMENTS.dump(row, names) for row in visible(rows, get=dict.get)
+    ]
+    return page_response(request, results, next_cursor)
+
+
+@api_view
+def group_list(request):
+    names = fields_param(request, GROUPS)
+    limit = limit_param(request)
+    queryset = Group.objects.order_by('slug')
+    if request.GET.get('cursor'):
+        slug, = decode_cursor(request.GET['cursor'], 1)
+        queryset = queryset.filter(slug__gt=slug)
+    rows = list(GROUPS.values(queryset, names, extra=('slug',))[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = cursors.encode(rows[limit - 1]['slug'])
+    return page_response(
+        request, [GROUPS.dump(row, names) for row in rows[:limit]],
+        next_cursor,
+    )
+
+
+@api_view
+def group_detail(request, slug):
+    names = fields_param(request, GROUPS)
+    row = GROUPS.values(Group.objects.filter(slug=slug), names).first()
+    if row is None:
+        raise Http404
+    return json_response(GROUPS.dump(row, names))
+
+
+@api_view
+def profile_detail(request, username):
+    names = fields_param(request, PROFILES)
+    row = PROFILES.values(
+        User.objects.filter(username=username), names
+    ).first()
+    if row is None:
+        raise Http404
+    return json_response(PROFILES.dump(row, names))
@@ -3,3 +3,15 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import metrics, template_profiling
+
+        if settings.METRICS_ENABLED:
+            metrics.install_template_timing()
+        if settings.TEMPLATE_PROFILING:
+            template_profiling.install(
+                settings.TEMPLATE_PROFILING_LIBRARIES
+            )
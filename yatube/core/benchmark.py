@@ -0,0 +1,182 @@
+"""Замеры задержки, числа запросов и размера ответа для маршрутов.
+
+Используется командой ``benchmark`` на сгенерированных данных
+(см. ``generate_data``).
+"""
+import math
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+Route = namedtuple('Route', 'name method auth args data')
+
+ROUTES = (
+    Route('posts:index', 'get', False, (), None),
+    Route('posts:group_list', 'get', False, ('group',), None),
+    Route('posts:profile', 'get', False, ('author',), None),
+    Route('posts:post_detail', 'get', False, ('post',), None),
+    Route('posts:follow_index', 'get', True, (), None),
+    Route('posts:post_create', 'post', True, (),
+          {'text': 'Пост из бенчмарка'}),
+    Route('posts:add_comment', 'post', True, ('post',),
+          {'text': 'Комментарий из бенчмарка'}),
+    Route('posts:profile_follow', 'get', True, ('author',), None),
+    Route('users:login', 'get', False, (), None),
+    Route('users:signup', 'get', False, (), None),
+    Route('users:password_change', 'get', True, (), None),
+    Route('users:password_reset', 'get', False, (), None),
+    Route('about:author', 'get', False, (), None),
+    Route('about:tech', 'get', False, (), None),
+)
+
+# Метрики, по которым ищутся регрессии
+METRICS = ('p50_ms', 'p95_ms', 'queries', 'bytes')
+# Колебания задержки меньше этого порога считаются шумом
+LATENCY_NOISE_MS = 1.0
+
+
+def percentile(values, pct):
+    """Процентиль методом ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def ok(status):
+    """Ответ без ошибки: 2xx или перенаправление."""
+    return 200 <= status < 400
+
+
+def route_objects(username=None):
+    """Объекты для аргументов маршрутов из текущих данных."""
+    if username:
+        user = User.objects.get(username=username)
+    else:
+        user = User.objects.annotate(
+            follows=Count('follower')
+        ).order_by('-follows', 'pk').first()
+    post = Post.objects.exclude(author=user).first() or Post.objects.first()
+    group = Group.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total', 'pk').first()
+    if not (user and post and group):
+        raise ValueError(
+            'Нужны пользователь, пост и группа: запустите generate_data.'
+        )
+    return {
+        'user': user,
+        'post': post.pk,
+        'author': post.author.username,
+        'group': group.slug,
+    }
+
+
+def response_size(response):
+    """Размер тела; потоковый ответ дочитывается, и рендер попадает
+    в замер."""
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def measure(client, route, objects):
+    url = reverse(route.name, args=[objects[arg] for arg in route.args])
+    send = getattr(client, route.method)
+    # Чтения роутер отправляет и на реплики.
+    with ExitStack() as stack:
+        captured = [
+            stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        ]
+        started = time.perf_counter()
+        response = send(url, route.data) if route.data else send(url)
+        size = response_size(response)
+        elapsed = time.perf_counter() - started
+    queries = sum(len(queries) for queries in captured)
+    return elapsed * 1000, queries, size, response
+
+
+def run(iterations=20, warmup=2, username=None, routes=ROUTES):
+    """Прогоняет каждый маршрут и возвращает сводку по метрикам.
+
+    Изменяющие запросы выполняются в транзакции, которая
+    откатывается, поэтому набор данных не меняется. Лимиты запросов
+    отключены, а кеш сбрасывается перед каждым маршрутом: иначе
+    повторы упираются в 429 и замеряется отказ, а не сам view.
+    """
+    with override_settings(RATE_LIMIT_ENABLED=False):
+        return _run(iterations, warmup, username, routes)
+
+
+def _run(iterations, warmup, username, routes):
+    objects = route_objects(username)
+    guest = Client()
+    member = Client()
+    member.force_login(objects['user'])
+    results = {}
+    for route in routes:
+        cache.clear()
+        client = member if route.auth else guest
+        timings = []
+        queries = size = status = 0
+        for number in range(warmup + iterations):
+            with transaction.atomic():
+                elapsed, queries, size, response = measure(
+                    client, route, objects
+                )
+                transaction.set_rollback(True)
+            # Первый ответ с ошибкой не затирается последующими.
+            if number == 0 or ok(status):
+                status = response.status_code
+            if number >= warmup:
+                timings.append(elapsed)
+        results[route.name] = {
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'queries': queries,
+            'bytes': size,
+            'status': status,
+        }
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """Список регрессий относительно сохранённого прогона.
+
+    Маршрут, ответивший ошибкой или другим статусом, чем в эталоне,
+    считается регрессией: его метрики замеряют не тот ответ.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        status = current['status']
+        expected = previous and previous.get('status')
+        if not ok(status) or expected and status != expected:
+            regressions.append(f'{name} status: {expected} -> {status}')
+        if previous is None:
+            continue
+        for metric in METRICS:
+            old, new = previous[metric], current[metric]
+            if metric == 'queries':
+                worse = new > old
+            else:
+                worse = new > old * (1 + threshold)
+                if metric.endswith('_ms'):
+                    worse = worse and new - old > LATENCY_NOISE_MS
+            if worse:
+                regressions.append(f'{name} {metric}: {old} -> {new}')
+    return regressions
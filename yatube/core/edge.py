@@ -0,0 +1,68 @@
+"""Кешируемая «оболочка» страниц с персональными дырками.
+
+Страница, обёрнутая ``edge_shell``, при ``EDGE_SHELL = True``
+рендерится для анонимного пользователя и отдаётся с
+``Cache-Control: public`` — её может кешировать общий прокси.
+Персональные куски (блок пользователя в шапке, кнопка подписки, форма
+комментария) вставляются тегом ``{% hole %}``: в режиме оболочки он
+выводит ``<esi:include>`` на ``/fragments/<имя>/``, иначе рендерит
+фрагмент на месте, как раньше.
+"""
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+
+FRAGMENTS = {}
+
+
+def fragment(name, template_name):
+    """Регистрирует фрагмент: функция получает запрос и параметры
+    дырки (из ``GET`` они приходят строками) и возвращает контекст."""
+    def decorator(func):
+        FRAGMENTS[name] = (template_name, func)
+        return func
+    return decorator
+
+
+def render_fragment(name, request, params):
+    template_name, func = FRAGMENTS[name]
+    return render_to_string(template_name, func(request, **params), request)
+
+
+def fragment_url(name, params):
+    url = reverse('fragment', args=[name])
+    return f'{url}?{urlencode(params)}' if params else url
+
+
+def is_shell(request):
+    return getattr(request, 'edge_shell', False)
+
+
+def edge_shell(view):
+    """Отдаёт страницу как общую для всех оболочку при ``EDGE_SHELL``.
+
+    Пользователь подменяется анонимным: ни view, ни шаблон не трогают
+    сессию, поэтому в ответ не попадают ``Vary: Cookie`` и cookie.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.EDGE_SHELL:
+            return view(request, *args, **kwargs)
+        request.edge_shell = True
+        request.user = AnonymousUser()
+        response = view(request, *args, **kwargs)
+        patch_cache_control(
+            response, public=True, max_age=settings.EDGE_SHELL_MAX_AGE
+        )
+        return response
+    return wrapper
+
+
+@fragment('header_user', 'fragments/header_user.html')
+def header_user(request, view=''):
+    return {'view_name': view}
@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95 задержку, число SQL-запросов и размер ответа '
+        'для всех маршрутов и сравнивает с сохранённым прогоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--username',
+            help='Пользователь для авторизованных маршрутов.'
+        )
+        parser.add_argument(
+            '--output', help='Куда записать результаты в формате JSON.'
+        )
+        parser.add_argument(
+            '--compare', help='JSON с эталонным прогоном для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый относительный рост метрик.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = benchmark.run(
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                username=options['username'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:28} p50 {result["p50_ms"]:8.2f} мс  '
+                f'p95 {result["p95_ms"]:8.2f} мс  '
+                f'{result["queries"]:3} запр.  {result["bytes"]:8} Б'
+            )
+        if options['output']:
+            report = {
+                'created': timezone.now().isoformat(),
+                'iterations': options['iterations'],
+                'routes': results,
+            }
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                routes = json.load(baseline)['routes']
+            regressions = benchmark.compare(
+                results, routes, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии производительности:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
@@ -0,0 +1,28 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core import memory
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает другую команду под tracemalloc и печатает пик памяти '
+        'и главные места аллокаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('command', help='Имя профилируемой команды.')
+        parser.add_argument(
+            'args', nargs='*',
+            help='Аргументы профилируемой команды (опции — после `--`).'
+        )
+        parser.add_argument('--top', type=int, default=None)
+
+    def handle(self, *args, **options):
+        with memory.MemoryProfile(limit=options['top']) as profile:
+            call_command(
+                options['command'], *args,
+                stdout=self.stdout, stderr=self.stderr
+            )
+        memory.observe(f'command:{options["command"]}', profile)
+        self.stdout.write(profile.report())
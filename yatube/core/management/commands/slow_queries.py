@@ -0,0 +1,46 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slow_queries import record, reset, top_queries
+
+SORT_KEYS = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms'}
+
+
+class Command(BaseCommand):
+    help = 'Показывает самые тяжёлые запросы из журнала медленных запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=settings.SLOW_QUERY_LOG,
+            help='Путь к журналу (по умолчанию SLOW_QUERY_LOG).'
+        )
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--sort', choices=sorted(SORT_KEYS), default='total',
+            help='Сортировка: суммарное время, число или максимум.'
+        )
+
+    def handle(self, *args, **options):
+        reset()
+        try:
+            with open(options['file'], encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        record(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {options["file"]} не найден.')
+        queries = top_queries(options['limit'], SORT_KEYS[options['sort']])
+        for query in queries:
+            self.stdout.write(
+                f'{query["fingerprint"]}  {query["count"]:6} раз  '
+                f'всего {query["total_ms"]:10.1f} мс  '
+                f'макс {query["max_ms"]:8.1f} мс  '
+                f'{", ".join(sorted(query["views"]))}'
+            )
+            self.stdout.write(f'    {query["sql"]}')
+            if query['source']:
+                self.stdout.write(f'    {query["source"]}')
@@ -0,0 +1,35 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+
+
+class Command(BaseCommand):
+    help = 'Копирует SQLite-базу primary в файл реплики для чтения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'alias', nargs='?', default='replica',
+            help='Алиас реплики из settings.DATABASES.'
+        )
+
+    def handle(self, *args, **options):
+        alias = options['alias']
+        if alias not in settings.DATABASES:
+            raise CommandError(f'База `{alias}` не описана в DATABASES.')
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replica = settings.DATABASES[alias]
+        if {primary['ENGINE'], replica['ENGINE']} != {SQLITE_ENGINE}:
+            raise CommandError('Команда работает только с SQLite.')
+        source = sqlite3.connect(primary['NAME'])
+        target = sqlite3.connect(replica['NAME'])
+        try:
+            # Онлайн-бэкап не блокирует писателей primary надолго.
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(f'Реплика `{alias}` обновлена: {replica["NAME"]}')
@@ -0,0 +1,99 @@
+"""Профилирование памяти запросов и команд через tracemalloc.
+
+tracemalloc следит за всем процессом: в многопоточном сервере в замер
+попадут и аллокации соседних потоков, поэтому включать его стоит на
+отдельном воркере или по заголовку для единичных запросов. Замеры
+считаются, и трассировку выключает последний из них: иначе снимок
+соседнего запроса упал бы с RuntimeError.
+"""
+import linecache
+import logging
+import threading
+import tracemalloc
+
+from django.conf import settings
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger('yatube.memory')
+
+MEMORY_BUCKETS = (
+    2 ** 16, 2 ** 18, 2 ** 20, 2 ** 22, 2 ** 24, 2 ** 26, 2 ** 28
+)
+
+memory_peak = REGISTRY.histogram(
+    'yatube_view_memory_peak_bytes',
+    'Пиковый прирост памяти за ответ (tracemalloc).',
+    MEMORY_BUCKETS
+)
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+)
+
+
+# Число идущих замеров и включил ли трассировку первый из них.
+_tracing = {'active': 0, 'started': False}
+_tracing_lock = threading.Lock()
+
+
+def _start_tracing():
+    with _tracing_lock:
+        if not _tracing['active']:
+            _tracing['started'] = not tracemalloc.is_tracing()
+            if _tracing['started']:
+                tracemalloc.start(settings.MEMORY_PROFILING_FRAMES)
+        _tracing['active'] += 1
+        return _tracing['active'] == 1 and _tracing['started']
+
+
+def _stop_tracing():
+    with _tracing_lock:
+        _tracing['active'] -= 1
+        if not _tracing['active'] and _tracing['started']:
+            tracemalloc.stop()
+
+
+class MemoryProfile:
+    """Контекстный менеджер: пик памяти и главные места аллокаций."""
+
+    def __init__(self, limit=None):
+        self.limit = limit or settings.MEMORY_PROFILING_TOP
+        self.peak = 0
+        self.top = []
+
+    def __enter__(self):
+        started = _start_tracing()
+        if not started and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        self.before = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        return self
+
+    def __exit__(self, *exc_info):
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak = max(peak - self.baseline, 0)
+        after = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        _stop_tracing()
+        self.top = [
+            stat for stat in after.compare_to(self.before, 'lineno')
+            if stat.size_diff > 0
+        ][:self.limit]
+        self.before = None
+
+    def report(self):
+        lines = [f'Пик памяти: {self.peak / 1024:.1f} КиБ']
+        for stat in self.top:
+            frame = stat.traceback[0]
+            lines.append(
+                f'{stat.size_diff / 1024:10.1f} КиБ  {stat.count_diff:7} '
+                f'блоков  {frame.filename}:{frame.lineno}'
+            )
+        return '\n'.join(lines)
+
+
+def observe(view, profile):
+    memory_peak.observe(profile.peak, view=view)
+    logger.info('%s\n%s', view, profile.report())
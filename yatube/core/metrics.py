@@ -0,0 +1,209 @@
+"""Гистограммы производительности в памяти процесса.
+
+Метрики копятся в каждом процессе отдельно и отдаются по ``/metrics``
+в текстовом формате Prometheus.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from . import writes
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_local = threading.local()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    inner = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return '{' + inner + '}'
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0, 'count': 0
+                }
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self.lock:
+            series = sorted(self.series.items())
+            for labels, values in series:
+                cumulative = 0
+                for bound, count in zip(self.buckets, values['buckets']):
+                    cumulative += count
+                    lines.append(
+                        f'{self.name}_bucket'
+                        f'{_format_labels(labels, le=bound)} {cumulative}'
+                    )
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{_format_labels(labels, le="+Inf")} {values["count"]}'
+                )
+                lines.append(
+                    f'{self.name}_sum{_format_labels(labels)} '
+                    f'{values["sum"]}'
+                )
+                lines.append(
+                    f'{self.name}_count{_format_labels(labels)} '
+                    f'{values["count"]}'
+                )
+        return lines
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Registry:
+    def __init__(self):
+        self.histograms = []
+        self.collectors = []
+
+    def histogram(self, name, documentation, buckets):
+        histogram = Histogram(name, documentation, buckets)
+        self.histograms.append(histogram)
+        return histogram
+
+    def collector(self, func):
+        """Функция, отдающая строки метрик в момент выгрузки."""
+        self.collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        for histogram in self.histograms:
+            histogram.reset()
+
+
+REGISTRY = Registry()
+
+view_duration = REGISTRY.histogram(
+    'yatube_view_duration_seconds', 'Полное время ответа view.',
+    DURATION_BUCKETS
+)
+sql_queries = REGISTRY.histogram(
+    'yatube_view_sql_queries', 'Число SQL-запросов за ответ.',
+    QUERY_BUCKETS
+)
+sql_duration = REGISTRY.histogram(
+    'yatube_view_sql_seconds', 'Время SQL-запросов за ответ.',
+    DURATION_BUCKETS
+)
+template_duration = REGISTRY.histogram(
+    'yatube_view_template_seconds', 'Время рендеринга шаблонов за ответ.',
+    DURATION_BUCKETS
+)
+response_size = REGISTRY.histogram(
+    'yatube_view_response_bytes', 'Размер тела ответа.', SIZE_BUCKETS
+)
+
+
+@REGISTRY.collector
+def lock_metrics():
+    lines = []
+    for name, value in sorted(writes.lock_stats().items()):
+        metric = f'yatube_db_{name}_total'
+        lines.append(f'# TYPE {metric} counter')
+        lines.append(f'{metric} {value}')
+    return lines
+
+
+class RequestSample:
+    """Счётчики одного замеряемого запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+
+def current_sample():
+    return getattr(_local, 'sample', None)
+
+
+def set_sample(sample):
+    _local.sample = sample
+
+
+def observe(view, wall_time, sample, size=None):
+    view_duration.observe(wall_time, view=view)
+    sql_queries.observe(sample.queries, view=view)
+    sql_duration.observe(sample.sql_time, view=view)
+    template_duration.observe(sample.template_time, view=view)
+    if size is not None:
+        response_size.observe(size, view=view)
+
+
+def timed_template_render(render):
+    """Обёртка ``Template.render``: учитывает только внешний рендер."""
+    @wraps(render)
+    def wrapper(*args, **kwargs):
+        sample = current_sample()
+        if sample is None:
+            return render(*args, **kwargs)
+        sample.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(*args, **kwargs)
+        finally:
+            sample.template_depth -= 1
+            if not sample.template_depth:
+                sample.template_time += time.perf_counter() - started
+    wrapper.timed = True
+    return wrapper
+
+
+def install_template_timing():
+    from django.template.backends.django import Template
+
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed_template_render(Template.render)
@@ -0,0 +1,153 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from . import memory, metrics, template_profiling
+from .routers import has_written, pin_primary
+from .slow_queries import SlowQueryLogger
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет чтения за primary во время и сразу после записи.
+
+    Небезопасный запрос ставит короткоживущую cookie; пока она есть,
+    чтения этого клиента не уходят на отстающую реплику.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in SAFE_METHODS
+        pin_primary(
+            writing or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+            # Запись возможна и в GET (например, подписка по ссылке).
+            writing = writing or has_written()
+        finally:
+            pin_primary(False)
+        if writing:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """Замеряет время, SQL, шаблоны и размер ответа для доли запросов.
+
+    Доля задаётся ``METRICS_SAMPLE_RATE``; результаты попадают в
+    гистограммы ``core.metrics`` с меткой имени view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (not settings.METRICS_ENABLED
+                or random.random() >= settings.METRICS_SAMPLE_RATE):
+            return self.get_response(request)
+        sample = metrics.RequestSample()
+        metrics.set_sample(sample)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sample.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.set_sample(None)
+        wall_time = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        metrics.observe(view, wall_time, sample, size)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Пишет в журнал медленные SQL-запросы с именем view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (settings.SLOW_QUERY_THRESHOLD_MS is None
+                or random.random() >= settings.SLOW_QUERY_SAMPLE_RATE):
+            return self.get_response(request)
+        wrapper = SlowQueryLogger(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return self.get_response(request)
+
+
+class TemplateProfileMiddleware:
+    """Отдаёт профиль шаблонов вместо страницы по ``X-Template-Profile``.
+
+    Работает только при ``TEMPLATE_PROFILING = True``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (not settings.TEMPLATE_PROFILING
+                or 'HTTP_X_TEMPLATE_PROFILE' not in request.META):
+            return self.get_response(request)
+        template_profiling.start()
+        try:
+            self.get_response(request)
+        finally:
+            profile = template_profiling.stop()
+        return HttpResponse(
+            profile.folded(), content_type='text/plain; charset=utf-8'
+        )
+
+
+class MemoryProfileMiddleware:
+    """Замеряет пик памяти запроса через tracemalloc.
+
+    Включается для всех запросов настройкой ``MEMORY_PROFILING`` или
+    для отдельного запроса заголовком ``X-Memory-Profile`` со значением
+    ``MEMORY_PROFILING_TOKEN``, если разрешён ``MEMORY_PROFILING_HEADER``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def enabled(self, request):
+        if settings.MEMORY_PROFILING:
+            return True
+        return bool(
+            settings.MEMORY_PROFILING_HEADER
+            and settings.MEMORY_PROFILING_TOKEN
+            and constant_time_compare(
+                request.META.get('HTTP_X_MEMORY_PROFILE', ''),
+                settings.MEMORY_PROFILING_TOKEN,
+            )
+        )
+
+    def __call__(self, request):
+        if not self.enabled(request):
+            return self.get_response(request)
+        with memory.MemoryProfile() as profile:
+            response = self.get_response(request)
+        match = request.resolver_match
+        memory.observe(match.view_name if match else 'unresolved', profile)
+        response['X-Memory-Peak'] = str(profile.peak)
+        return response
@@ -0,0 +1,148 @@
+"""Ограничение частоты запросов к изменяющим view через кеш.
+
+Лимиты задаются в ``RATE_LIMITS`` для имени view отдельно по
+пользователю и по IP: ``{'user': '10/m', 'ip': '30/m'}``. Счёт ведётся
+скользящим окном: запросы текущего окна фиксированной длины плюс
+запросы прошлого с весом непрошедшей его доли. Поэтому на границе окон
+нет всплеска до двух лимитов подряд, а счётчики по-прежнему меняются
+атомарными ``cache.add``/``cache.incr``/``cache.decr`` (memcached,
+Redis, LocMemCache) без гонок «прочитал-записал». Отклонённый запрос
+не учитывается.
+
+За обратным прокси IP клиента берётся из ``X-Forwarded-For``, только
+если запрос пришёл с адреса из ``RATE_LIMIT_TRUSTED_PROXIES``.
+
+Для нескольких процессов нужен общий кеш: у LocMemCache свой
+счётчик в каждом процессе.
+"""
+import ipaddress
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """``'10/m'`` → ``(10, 60)``: число запросов и длина окна в секундах."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def _incr(cache_key, timeout):
+    if cache.add(cache_key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(cache_key)
+    except ValueError:
+        # Ключ истёк между add и incr.
+        cache.add(cache_key, 1, timeout)
+        return 1
+
+
+def hit(key, limit, period, now=None):
+    """Учитывает запрос; возвращает ``None`` или секунды до того, как
+    скользящее окно пропустит следующий."""
+    now = time.time() if now is None else now
+    window = int(now // period)
+    # Счётчик окна читается и следующим окном как прошлый.
+    current = f'ratelimit:{key}:{window}'
+    count = _incr(current, 2 * period + 1)
+    previous = cache.get(f'ratelimit:{key}:{window - 1}', 0)
+    elapsed = now - window * period
+    if previous * (1 - elapsed / period) + count <= limit:
+        return None
+    try:
+        cache.decr(current)
+    except ValueError:
+        pass
+    if count <= limit:
+        # Хватит, когда вес прошлого окна упадёт до свободного места.
+        wait = period * (1 - (limit - count) / previous) - elapsed
+    else:
+        # В следующем окне прошлым станет текущее без этого запроса.
+        wait = period - elapsed + period * (
+            1 - (limit - 1) / max(count - 1, 1)
+        )
+    return max(math.ceil(wait), 1)
+
+
+def _trusted(address, networks):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_ip(request):
+    """IP клиента: ``REMOTE_ADDR`` или, если это доверенный прокси,
+    правый адрес ``X-Forwarded-For`` не из доверенных прокси."""
+    address = request.META.get('REMOTE_ADDR', '')
+    networks = [
+        ipaddress.ip_network(proxy, strict=False)
+        for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES
+    ]
+    if not networks or not _trusted(address, networks):
+        return address
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    # Левые адреса клиент может подставить сам.
+    for hop in reversed([hop.strip() for hop in forwarded.split(',')]):
+        if not hop:
+            break
+        address = hop
+        if not _trusted(hop, networks):
+            break
+    return address
+
+
+def check(name, request):
+    """Наибольшее ``Retry-After`` среди превышенных лимитов view."""
+    limits = settings.RATE_LIMITS.get(name, {})
+    retry_after = None
+    for scope, rate in limits.items():
+        if scope == 'user':
+            if not request.user.is_authenticated:
+                continue
+            ident = request.user.pk
+        else:
+            ident = client_ip(request)
+        limit, period = parse_rate(rate)
+        wait = hit(f'{name}:{scope}:{ident}', limit, period)
+        if wait is not None:
+            retry_after = max(retry_after or 0, wait)
+    return retry_after
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(
+        'Слишком много запросов. Попробуйте позже.',
+        status=429, content_type='text/plain; charset=utf-8'
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(name, methods=None):
+    """Декоратор view: запросы сверх ``RATE_LIMITS[name]`` получают 429
+    с ``Retry-After``. По умолчанию считаются только изменяющие методы;
+    ``methods`` нужен view, которые пишут и на GET."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limited = (
+                request.method in methods if methods
+                else request.method not in SAFE_METHODS
+            )
+            if settings.RATE_LIMIT_ENABLED and limited:
+                retry_after = check(name, request)
+                if retry_after is not None:
+                    return too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
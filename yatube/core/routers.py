@@ -0,0 +1,57 @@
+"""Маршрутизация запросов к БД: запись в primary, чтение с реплик."""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def pin_primary(pinned=True):
+    """Направлять чтения текущего потока в primary."""
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    """Была ли запись в текущем потоке после ``pin_primary``."""
+    return getattr(_state, 'wrote', False)
+
+
+def replica_aliases():
+    return [
+        alias for alias in settings.DATABASE_REPLICAS
+        if alias in settings.DATABASES
+    ]
+
+
+class PrimaryReplicaRouter:
+    """Чтения уходят на случайную реплику, всё остальное — в primary.
+
+    Пока поток закреплён за primary (см. ``PrimaryPinMiddleware``),
+    чтения тоже идут в primary: пользователь сразу видит свою запись.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or is_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # После записи читаем только из primary до конца запроса.
+        _state.pinned = True
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат копию тех же данных.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
@@ -0,0 +1,38 @@
+from django import shortcuts
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template import loader
+
+from .edge import is_shell
+from .streaming import stream_template
+
+
+def render(request, template_name, context=None, content_type=None,
+           status=None, using=None, deferred=None):
+    """``django.shortcuts.render`` с потоковым режимом.
+
+    ``deferred`` — функция, возвращающая тяжёлую часть контекста. При
+    ``STREAMING_RESPONSES = True`` страница отдаётся через
+    ``StreamingHttpResponse``, и ``deferred`` вызывается уже после
+    отправки шапки (``core.streaming``). Тело рендерится после
+    middleware, поэтому CSRF-токен и сессия пользователя запрашиваются
+    заранее: иначе cookie и ``Vary: Cookie`` не попали бы в заголовки
+    (кроме общей оболочки ``core.edge``, где они не нужны).
+    """
+    if not settings.STREAMING_RESPONSES:
+        context = dict(context or {})
+        if deferred is not None:
+            context.update(deferred())
+        return shortcuts.render(
+            request, template_name, context, content_type, status, using
+        )
+    template = loader.get_template(template_name, using=using)
+    if not is_shell(request):
+        get_token(request)
+        request.user.is_authenticated
+    return StreamingHttpResponse(
+        stream_template(template, context, request, deferred),
+        content_type=content_type,
+        status=status,
+    )
@@ -0,0 +1,162 @@
+"""Журнал медленных SQL-запросов с привязкой к view.
+
+Запросы дольше ``SLOW_QUERY_THRESHOLD_MS`` пишутся JSON-строками в
+логгер ``yatube.slow_queries`` и агрегируются по отпечатку
+нормализованного SQL. Разбор журнала — команда ``slow_queries``.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger('yatube.slow_queries')
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def normalize(sql):
+    """SQL без литералов и с одинаковой записью списков IN."""
+    sql = _STRING.sub('%s', sql)
+    sql = _NUMBER.sub('%s', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:12]
+
+
+def params_shape(params, many=False):
+    """Типы параметров без значений: ``(int, str*3)``."""
+    if many:
+        params = list(params)
+        inner = params_shape(params[0]) if params else '()'
+        return f'{len(params)}x{inner}'
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(sorted(params)) + '}'
+    runs = []
+    for param in params:
+        name = type(param).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return '(' + ', '.join(
+        name if count == 1 else f'{name}*{count}' for name, count in runs
+    ) + ')'
+
+
+def source_frame():
+    """Кадр view, из которого пришёл запрос.
+
+    Берётся ближайший кадр из ``views.py`` проекта, а если запрос
+    выполнен вне view — ближайший кадр кода проекта.
+    """
+    here = os.path.abspath(__file__)
+    fallback = None
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename == here or not filename.startswith(settings.BASE_DIR):
+            continue
+        path = os.path.relpath(filename, settings.BASE_DIR)
+        location = f'{path}:{frame.lineno} in {frame.name}'
+        if filename.endswith('views.py'):
+            return location
+        fallback = fallback or location
+    return fallback
+
+
+def record(entry):
+    with _stats_lock:
+        stats = _stats.get(entry['fingerprint'])
+        if stats is None:
+            stats = _stats[entry['fingerprint']] = {
+                'sql': entry['sql'], 'count': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'views': set(),
+            }
+        stats['count'] += 1
+        stats['total_ms'] += entry['duration_ms']
+        stats['max_ms'] = max(stats['max_ms'], entry['duration_ms'])
+        stats['views'].add(entry['view'])
+        stats['source'] = entry.get('source')
+
+
+def top_queries(limit=10, key='total_ms'):
+    with _stats_lock:
+        items = [dict(stats, fingerprint=fp) for fp, stats in _stats.items()]
+    return sorted(items, key=lambda item: item[key], reverse=True)[:limit]
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+class SlowQueryLogger:
+    """execute_wrapper, отмечающий медленные запросы запроса ``request``."""
+
+    def __init__(self, request):
+        self.request = request
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def view_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else 'unresolved'
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.log(sql, params, many, duration)
+
+    def log(self, sql, params, many, duration):
+        normalized = normalize(sql)
+        entry = {
+            'fingerprint': fingerprint(normalized),
+            'sql': normalized,
+            'params': params_shape(params, many),
+            'duration_ms': round(duration * 1000, 3),
+            'view': self.view_name(),
+            'source': source_frame(),
+        }
+        record(entry)
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+@REGISTRY.collector
+def slow_query_metrics():
+    with _stats_lock:
+        items = sorted(
+            (fp, stats['count'], stats['total_ms'] / 1000)
+            for fp, stats in _stats.items()
+        )
+    lines = ['# TYPE yatube_slow_queries_total counter']
+    lines.extend(
+        f'yatube_slow_queries_total{{fingerprint="{fp}"}} {count}'
+        for fp, count, _ in items
+    )
+    lines.append('# TYPE yatube_slow_query_seconds_total counter')
+    lines.extend(
+        f'yatube_slow_query_seconds_total{{fingerprint="{fp}"}} {seconds}'
+        for fp, _, seconds in items
+    )
+    return lines
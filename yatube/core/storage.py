@@ -0,0 +1,58 @@
+"""Хранилище статики с хешами в именах и gzip-копиями.
+
+``collectstatic`` кладёт в ``STATIC_ROOT`` файлы вида
+``css/site.3f2a1b9c0d4e.css``, манифест ``staticfiles.json`` и рядом с
+текстовыми файлами — сжатые ``.gz``. Такие файлы не меняются, поэтому
+``core.views.serve_static`` отдаёт их с годовым ``immutable`` кешем.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map', '.ico',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        # Файла нет в манифесте (collectstatic ещё не запускался или
+        # файла нет в STATICFILES_DIRS): отдаём имя как есть, а не
+        # роняем каждую страницу с {% static %}.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def is_hashed(self, name):
+        """Имя из манифеста — содержимое файла под ним не меняется."""
+        if not hasattr(self, '_hashed_names'):
+            self._hashed_names = set(self.hashed_files.values())
+        return name in self._hashed_names
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        self.__dict__.pop('_hashed_names', None)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                compressed = self.compress(name)
+                if compressed:
+                    yield name, compressed, True
+
+    def compress(self, name):
+        """Пишет ``name.gz``, если сжатие уменьшает файл."""
+        with self.open(name) as original:
+            content = original.read()
+        # mtime=0: одинаковый вход даёт одинаковый .gz при каждой сборке.
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return None
+        gzip_name = f'{name}.gz'
+        if self.exists(gzip_name):
+            self.delete(gzip_name)
+        self._save(gzip_name, ContentFile(compressed))
+        return gzip_name
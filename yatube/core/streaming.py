@@ -0,0 +1,35 @@
+"""Потоковая отдача страницы: шапка до запросов тела.
+
+Страница рендерится обычным ``Template.render`` и делится по одной
+метке ``MARKER``, которую ``base.html`` выводит перед ``<main>``.
+Сначала шаблон рендерится с ``stream_head``: ``base.html`` пропускает
+блок ``main``, и клиенту уходит всё до метки — ``<head>`` и шапка
+страницы. Затем view досчитывает тяжёлую часть контекста
+(``deferred``: пагинация, карточки, комментарии), и уходит остаток
+полной страницы после метки.
+
+Шаблон без метки отдаётся одним куском. Каждый проход — обычный
+рендер без открытых курсоров, поэтому медленный клиент не держит
+транзакцию чтения SQLite.
+"""
+from django.utils.safestring import mark_safe
+
+MARKER = mark_safe('<!-- stream -->')
+
+
+def stream_template(template, context=None, request=None, deferred=None):
+    """Куски HTML шаблона ``template``: до метки и после неё.
+
+    ``deferred`` — функция без аргументов, возвращающая словарь,
+    которым контекст дополняется после отправки шапки.
+    """
+    context = dict(context or {}, stream_marker=MARKER)
+    head, found, _ = template.render(
+        dict(context, stream_head=True), request
+    ).partition(MARKER)
+    if found:
+        yield head
+    if deferred is not None:
+        context.update(deferred())
+    page = template.render(context, request)
+    yield page.partition(MARKER)[2] if found else page
@@ -0,0 +1,141 @@
+"""Профилирование рендеринга шаблонов.
+
+При ``TEMPLATE_PROFILING = True`` шаблоны, теги и фильтры из
+``TEMPLATE_PROFILING_LIBRARIES`` оборачиваются таймерами. Замер
+включается для запроса заголовком ``X-Template-Profile`` и
+возвращается вместо страницы в формате свёрнутых стеков
+(``flamegraph.pl``, speedscope): ``шаблон;тег;... микросекунды``.
+"""
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from importlib import import_module
+
+from django.template.base import Node, Template, TextNode, VariableNode
+
+_local = threading.local()
+
+UNTIMED_NODES = (TextNode, VariableNode)
+
+# (объект, имя, исходное значение) для uninstall
+_originals = []
+
+
+class Profile:
+    def __init__(self):
+        self.stack = []
+        self.samples = defaultdict(float)
+
+    def enter(self, name):
+        self.stack.append([name.replace(' ', '_'), time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, started, children = self.stack[-1]
+        elapsed = time.perf_counter() - started
+        key = ';'.join(frame[0] for frame in self.stack)
+        self.stack.pop()
+        self.samples[key] += elapsed - children
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def folded(self):
+        """Свёрнутые стеки с собственным временем в микросекундах."""
+        return ''.join(
+            f'{stack} {round(seconds * 1e6)}\n'
+            for stack, seconds in sorted(self.samples.items())
+        )
+
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+
+def start():
+    _local.profile = Profile()
+    return _local.profile
+
+
+def stop():
+    profile = current_profile()
+    _local.profile = None
+    return profile
+
+
+def timed(func, frame_name):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = current_profile()
+        if profile is None:
+            return func(*args, **kwargs)
+        profile.enter(frame_name(*args))
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.exit()
+    wrapper.profiled = True
+    return wrapper
+
+
+def node_name(node):
+    """``tag:<функция>`` для simple/inclusion-тегов, иначе класс узла."""
+    func = getattr(node, 'func', None)
+    if func is not None:
+        return f'tag:{func.__name__}'
+    return f'tag:{type(node).__name__}'
+
+
+def _render_annotated(render_annotated):
+    @wraps(render_annotated)
+    def wrapper(node, context):
+        profile = current_profile()
+        if profile is None or isinstance(node, UNTIMED_NODES):
+            return render_annotated(node, context)
+        profile.enter(node_name(node))
+        try:
+            return render_annotated(node, context)
+        finally:
+            profile.exit()
+    wrapper.profiled = True
+    return wrapper
+
+
+def _replace(target, name, value):
+    if isinstance(target, dict):
+        _originals.append((target, name, target[name]))
+        target[name] = value
+    else:
+        _originals.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+
+def install(libraries=()):
+    """Оборачивает рендеринг шаблонов и узлов таймерами (один раз)."""
+    if _originals:
+        return
+    _replace(Template, '_render', timed(
+        Template._render, lambda template, context: f'template:{template.name}'
+    ))
+    _replace(Node, 'render_annotated', _render_annotated(
+        Node.render_annotated
+    ))
+    for path in libraries:
+        library = import_module(path).register
+        for name, func in list(library.filters.items()):
+            _replace(library.filters, name, timed(
+                func, lambda *args, name=name: f'filter:{name}'
+            ))
+
+
+def uninstall():
+    """Возвращает исходные методы и фильтры, заменённые ``install``.
+
+    Уже скомпилированные шаблоны держат обёрнутые фильтры, поэтому
+    кеш загрузчиков шаблонов нужно сбросить отдельно.
+    """
+    while _originals:
+        target, name, value = _originals.pop()
+        if isinstance(target, dict):
+            target[name] = value
+        else:
+            setattr(target, name, value)
@@ -0,0 +1,18 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.edge import fragment_url, is_shell, render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **params):
+    """Персональный фрагмент: ESI-вставка в оболочке, иначе HTML."""
+    request = context.get('request')
+    if is_shell(request):
+        return format_html(
+            '<esi:include src="{}"/>', fragment_url(name, params)
+        )
+    return mark_safe(render_fragment(name, request, params))
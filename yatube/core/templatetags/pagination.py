@@ -0,0 +1,36 @@
+from django import template
+
+register = template.Library()
+
+ELLIPSIS = '…'
+
+
+def elided_page_range(num_pages, number, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг ``number`` и по краям, пропуски — ``…``.
+
+    Длина результата не зависит от ``num_pages``: при миллионе постов
+    страница пагинатора остаётся из десятка ссылок.
+    """
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        return list(range(1, num_pages + 1))
+    pages = []
+    if number > 1 + on_each_side + on_ends + 1:
+        pages.extend(range(1, on_ends + 1))
+        pages.append(ELLIPSIS)
+        pages.extend(range(number - on_each_side, number + 1))
+    else:
+        pages.extend(range(1, number + 1))
+    if number < num_pages - on_each_side - on_ends - 1:
+        pages.extend(range(number + 1, number + on_each_side + 1))
+        pages.append(ELLIPSIS)
+        pages.extend(range(num_pages - on_ends + 1, num_pages + 1))
+    else:
+        pages.extend(range(number + 1, num_pages + 1))
+    return pages
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=2, on_ends=1):
+    return elided_page_range(
+        page_obj.paginator.num_pages, page_obj.number, on_each_side, on_ends
+    )
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from core import benchmark
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='TestUserBench')
+        author = User.objects.create_user(username='TestAuthorBench')
+        group = Group.objects.create(title='Группа', slug='bench')
+        Post.objects.create(text='Пост', author=author, group=group)
+        Post.objects.create(text='Пост', author=user, group=group)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 95), 95)
+        self.assertEqual(benchmark.percentile([], 95), 0.0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'posts:index': {
+            'p50_ms': 10, 'p95_ms': 20, 'queries': 3, 'bytes': 1000,
+            'status': 200}}
+        results = {'posts:index': {
+            'p50_ms': 10.5, 'p95_ms': 40, 'queries': 4, 'bytes': 1000,
+            'status': 200}}
+        self.assertEqual(
+            benchmark.compare(results, baseline),
+            ['posts:index p95_ms: 20 -> 40', 'posts:index queries: 3 -> 4']
+        )
+
+    def test_compare_flags_status_changes(self):
+        baseline = {'posts:index': {
+            'p50_ms': 10, 'p95_ms': 20, 'queries': 3, 'bytes': 1000,
+            'status': 200}}
+        results = {
+            'posts:index': {
+                'p50_ms': 1, 'p95_ms': 1, 'queries': 1, 'bytes': 100,
+                'status': 302},
+            'about:tech': {
+                'p50_ms': 1, 'p95_ms': 1, 'queries': 0, 'bytes': 100,
+                'status': 500},
+        }
+        self.assertEqual(
+            benchmark.compare(results, baseline),
+            ['about:tech status: None -> 500',
+             'posts:index status: 200 -> 302']
+        )
+
+    @override_settings(STREAMING_RESPONSES=True)
+    def test_streaming_responses_are_measured(self):
+        routes = [
+            route for route in benchmark.ROUTES
+            if route.name == 'posts:post_detail'
+        ]
+        result = benchmark.run(iterations=1, warmup=0, routes=routes)[
+            'posts:post_detail'
+        ]
+        self.assertEqual(result['status'], 200)
+        self.assertGreater(result['bytes'], 0)
+        self.assertGreater(result['queries'], 0)
+
+    @override_settings(RATE_LIMITS={'post_create': {'user': '1/m'}})
+    def test_rate_limits_do_not_apply(self):
+        routes = [
+            route for route in benchmark.ROUTES
+            if route.name == 'posts:post_create'
+        ]
+        results = benchmark.run(iterations=3, warmup=0, routes=routes)
+        self.assertEqual(results['posts:post_create']['status'], 302)
+
+    def test_command_writes_json_and_compares(self):
+        """Прогон пишет JSON и не меняет данные."""
+        posts = Post.objects.count()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.json')
+            call_command('benchmark', iterations=1, warmup=0,
+                         output=path, stdout=StringIO())
+            with open(path) as report:
+                routes = json.load(report)['routes']
+            self.assertEqual(
+                set(routes), {route.name for route in benchmark.ROUTES})
+            self.assertEqual(routes['posts:index']['status'], 200)
+            self.assertEqual(Post.objects.count(), posts)
+            routes['posts:index']['queries'] = 0
+            with open(path, 'w') as report:
+                json.dump({'routes': routes}, report)
+            with self.assertRaises(CommandError):
+                call_command('benchmark', iterations=1, warmup=0,
+                             compare=path, stdout=StringIO())
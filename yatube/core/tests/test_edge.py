@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class EdgeShellTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(title='Группа', slug='edge')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Текст поста'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    @override_settings(EDGE_SHELL=True)
+    def test_shell_is_public_and_anonymous(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertFalse(response.has_header('Vary'))
+                self.assertFalse(response.cookies)
+                self.assertContains(
+                    response,
+                    '<esi:include src="/fragments/header_user/?view=',
+                )
+                self.assertNotContains(response, 'reader')
+                self.assertNotContains(response, 'csrfmiddlewaretoken')
+
+    @override_settings(EDGE_SHELL=True)
+    def test_post_detail_holes(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertContains(
+            response,
+            f'<esi:include src="/fragments/comment_form/?post_id='
+            f'{self.post.pk}"/>'
+        )
+
+    def test_without_shell_fragments_are_inline(self):
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertNotContains(response, '<esi:include')
+        self.assertContains(response, 'Пользователь: reader')
+        self.assertContains(response, 'Отписаться')
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_fragments_are_personal(self):
+        url = reverse('fragment', args=['follow_button'])
+        response = self.client.get(url, {
+            'username': self.author.username, 'author_id': self.author.pk,
+        })
+        self.assertContains(response, 'Отписаться')
+        self.assertIn('max-age=0', response['Cache-Control'])
+        response = self.client.get(
+            reverse('fragment', args=['comment_form']),
+            {'post_id': self.post.pk},
+        )
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        response = self.client.get(
+            reverse('fragment', args=['header_user']),
+            {'view': 'posts:index'},
+        )
+        self.assertContains(response, 'Пользователь: reader')
+
+    def test_unknown_fragment(self):
+        response = self.client.get(reverse('fragment', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('fragment', args=['comment_form']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_fragment_params(self):
+        for name, params in (
+            ('comment_form', {'post_id': 'abc'}),
+            ('post_edit_link', {'post_id': '-1', 'author': 'reader'}),
+            ('follow_button', {'username': 'a/b', 'author_id': 1}),
+            ('follow_button', {'username': '', 'author_id': 1}),
+        ):
+            with self.subTest(name=name, params=params):
+                response = self.client.get(
+                    reverse('fragment', args=[name]), params
+                )
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,58 @@
+import tracemalloc
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import memory
+from core.metrics import REGISTRY
+
+
+class MemoryProfileTest(TestCase):
+    def test_profile_reports_peak_and_sites(self):
+        with memory.MemoryProfile(limit=3) as profile:
+            data = [bytes(1024) for _ in range(1000)]
+        self.assertGreater(profile.peak, 1000 * 1024)
+        self.assertLessEqual(len(profile.top), 3)
+        self.assertIn('test_memory.py', profile.report())
+        del data
+
+    def test_overlapping_profiles_keep_tracing(self):
+        """Трассировку выключает последний из идущих замеров."""
+        first = memory.MemoryProfile().__enter__()
+        second = memory.MemoryProfile().__enter__()
+        first.__exit__(None, None, None)
+        self.assertTrue(tracemalloc.is_tracing())
+        second.__exit__(None, None, None)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    @override_settings(MEMORY_PROFILING_HEADER=True,
+                       MEMORY_PROFILING_TOKEN='secret')
+    def test_header_enables_profiling(self):
+        """Заголовок с токеном включает замер, пик попадает в ответ и
+        метрики."""
+        REGISTRY.reset()
+        response = self.client.get(reverse('about:author'))
+        self.assertNotIn('X-Memory-Peak', response)
+        response = self.client.get(
+            reverse('about:author'), HTTP_X_MEMORY_PROFILE='1')
+        self.assertNotIn('X-Memory-Peak', response)
+        response = self.client.get(
+            reverse('about:author'), HTTP_X_MEMORY_PROFILE='secret')
+        self.assertTrue(response['X-Memory-Peak'].isdigit())
+        self.assertIn(
+            'yatube_view_memory_peak_bytes_count{view="about:author"} 1',
+            REGISTRY.render()
+        )
+
+    @override_settings(MEMORY_PROFILING_HEADER=True)
+    def test_header_needs_token(self):
+        response = self.client.get(
+            reverse('about:author'), HTTP_X_MEMORY_PROFILE='')
+        self.assertNotIn('X-Memory-Peak', response)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('memprofile', 'check', stdout=out, stderr=StringIO())
+        self.assertIn('Пик памяти', out.getvalue())
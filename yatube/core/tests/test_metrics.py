@@ -0,0 +1,69 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import REGISTRY, Histogram
+
+
+class HistogramTest(TestCase):
+    def test_render_cumulative_buckets(self):
+        histogram = Histogram('test_seconds', 'Тест.', (0.1, 1.0))
+        histogram.observe(0.05, view='a')
+        histogram.observe(0.5, view='a')
+        histogram.observe(5, view='a')
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{view="a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="1.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{view="a"} 3', lines)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0)
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        REGISTRY.reset()
+
+    def test_view_metrics_exposed(self):
+        """Замеры view попадают на /metrics в формате Prometheus."""
+        self.client.get(reverse('about:author'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        for metric in ('duration_seconds', 'sql_queries', 'template_seconds',
+                       'response_bytes'):
+            with self.subTest(metric=metric):
+                self.assertIn(
+                    f'yatube_view_{metric}_count{{view="about:author"}} 1',
+                    body
+                )
+        self.assertIn('yatube_db_retries_total', body)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def test_sampling(self):
+        self.client.get(reverse('about:author'))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertNotIn('view="about:author"', body)
+
+    def test_forbidden_for_other_hosts(self):
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    def test_forbidden_through_proxy(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_X_FORWARDED_FOR='203.0.113.5')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required_when_set(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(
+            self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong')
+            .status_code, 404
+        )
+        response = self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer secret',
+            REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.5'
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.templatetags.pagination import ELLIPSIS, elided_page_range
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ElidedPageRangeTest(TestCase):
+    def test_small_range_is_complete(self):
+        self.assertEqual(elided_page_range(5, 3), [1, 2, 3, 4, 5])
+
+    def test_million_pages(self):
+        self.assertEqual(
+            elided_page_range(10 ** 6, 500000),
+            [1, ELLIPSIS, 499998, 499999, 500000, 500001, 500002,
+             ELLIPSIS, 10 ** 6]
+        )
+        self.assertEqual(
+            elided_page_range(10 ** 6, 1), [1, 2, 3, ELLIPSIS, 10 ** 6]
+        )
+        self.assertEqual(
+            elided_page_range(10 ** 6, 10 ** 6),
+            [1, ELLIPSIS, 999998, 999999, 10 ** 6]
+        )
+
+    def test_window_invariants(self):
+        """Окно ограничено, упорядочено и пропускает не меньше двух."""
+        for num_pages in range(1, 40):
+            for number in range(1, num_pages + 1):
+                pages = elided_page_range(num_pages, number)
+                self.assertLessEqual(len(pages), 9)
+                numbers = [page for page in pages if page != ELLIPSIS]
+                self.assertEqual(numbers, sorted(set(numbers)))
+                self.assertIn(number, numbers)
+                self.assertEqual((numbers[0], numbers[-1]), (1, num_pages))
+                for index, page in enumerate(pages):
+                    if page == ELLIPSIS:
+                        self.assertGreater(
+                            pages[index + 1] - pages[index - 1], 2
+                        )
+
+
+class PaginatorTemplateTest(TestCase):
+    @override_settings(PER_PAGE=1)
+    def test_feed_renders_window(self):
+        author = User.objects.create_user(username='many_posts')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {number}') for number in range(30)
+        )
+        response = self.client.get(
+            reverse('posts:profile', args=[author.username]), {'page': 15}
+        )
+        self.assertContains(response, ELLIPSIS, count=2)
+        self.assertContains(response, '?page=16"')
+        self.assertNotContains(response, '?page=10"')
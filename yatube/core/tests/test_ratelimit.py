@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.ratelimit import client_ip, hit, parse_rate
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='spammer')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/h'), (5, 3600))
+
+    def test_window(self):
+        """Лимит на окно; Retry-After — до места в скользящем окне."""
+        self.assertIsNone(hit('test', 2, 60, now=120.0))
+        self.assertIsNone(hit('test', 2, 60, now=130.0))
+        self.assertEqual(hit('test', 2, 60, now=150.5), 60)
+        self.assertEqual(hit('test', 2, 60, now=180.0), 30)
+        self.assertIsNone(hit('test', 2, 60, now=210.0))
+
+    def test_no_double_burst_at_window_edge(self):
+        """Всплеск в конце окна не даёт второго лимита сразу после."""
+        for second in range(10):
+            self.assertIsNone(hit('edge', 10, 60, now=110.0 + second / 10))
+        allowed = sum(
+            hit('edge', 10, 60, now=120.0 + second / 10) is None
+            for second in range(10)
+        )
+        self.assertEqual(allowed, 0)
+        self.assertIsNone(hit('edge', 10, 60, now=150.0))
+
+    def test_client_ip_without_trusted_proxy(self):
+        request = RequestFactory().get(
+            '/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4'
+        )
+        self.assertEqual(client_ip(request), '10.0.0.1')
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_client_ip_behind_trusted_proxy(self):
+        factory = RequestFactory()
+        request = factory.get(
+            '/', REMOTE_ADDR='10.0.0.1',
+            HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4, 10.0.0.2'
+        )
+        self.assertEqual(client_ip(request), '1.2.3.4')
+        request = factory.get(
+            '/', REMOTE_ADDR='8.8.8.8', HTTP_X_FORWARDED_FOR='1.2.3.4'
+        )
+        self.assertEqual(client_ip(request), '8.8.8.8')
+        request = factory.get('/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '10.0.0.1')
+
+    @override_settings(RATE_LIMITS={'add_comment': {'user': '2/m'}})
+    def test_add_comment_returns_429(self):
+        url = reverse('posts:add_comment', args=[self.post.pk])
+        for _ in range(2):
+            response = self.client.post(url, {'text': 'Спам'})
+            self.assertEqual(response.status_code, 302)
+        response = self.client.post(url, {'text': 'Спам'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 90)
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            ).status_code,
+            200
+        )
+
+    @override_settings(RATE_LIMITS={'signup': {'ip': '1/h'}})
+    def test_signup_limited_by_ip(self):
+        self.client.logout()
+        url = reverse('users:signup')
+        self.client.post(url, {})
+        response = self.client.post(url, {}, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        response = self.client.post(url, {}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATE_LIMITS={'profile_follow': {'user': '1/m'}})
+    def test_follow_limited_on_get(self):
+        url = reverse('posts:profile_follow', args=[self.author.username])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url).status_code, 429)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    @override_settings(
+        RATE_LIMIT_ENABLED=False, RATE_LIMITS={'post_create': {'user': '1/m'}}
+    )
+    def test_disabled(self):
+        url = reverse('posts:post_create')
+        for _ in range(3):
+            response = self.client.post(url, {'text': 'Пост'})
+            self.assertEqual(response.status_code, 302)
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.routers import PrimaryReplicaRouter, pin_primary
+from posts.models import Post
+
+
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        pin_primary(False)
+
+    def test_without_replicas_reads_from_primary(self):
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @mock.patch('core.routers.replica_aliases', return_value=['replica'])
+    def test_reads_go_to_replica(self, replicas):
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+    @mock.patch('core.routers.replica_aliases', return_value=['replica'])
+    def test_write_pins_reads_to_primary(self, replicas):
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_pin_cookie_after_write(self):
+        """После записи клиент получает cookie закрепления за primary."""
+        response = self.client.get(reverse('about:author'))
+        self.assertNotIn('pin_primary', response.cookies)
+        response = self.client.post(reverse('users:login'))
+        self.assertIn('pin_primary', response.cookies)
@@ -0,0 +1,58 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+
+
+class NormalizeTest(TestCase):
+    def test_normalize(self):
+        self.assertEqual(
+            slow_queries.normalize(
+                "SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s,  %s)"
+                " LIMIT 10"
+            ),
+            'SELECT * FROM t WHERE a = %s AND b IN (...) LIMIT %s'
+        )
+
+    def test_params_shape(self):
+        self.assertEqual(
+            slow_queries.params_shape((1, 2, 3, 'a')), '(int*3, str)')
+        self.assertEqual(
+            slow_queries.params_shape([(1,), (2,)], many=True), '2x(int)')
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        slow_queries.reset()
+
+    def test_queries_attributed_to_view(self):
+        """Медленный запрос помечен именем view и строкой posts/views.py."""
+        with self.assertLogs('yatube.slow_queries') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertTrue(logs.output)
+        top = slow_queries.top_queries()
+        self.assertEqual(top[0]['views'], {'posts:index'})
+        sources = {query['source'] for query in top}
+        self.assertTrue(any(
+            source and source.startswith(os.path.join('posts', 'views.py'))
+            for source in sources
+        ))
+
+    def test_command_prints_top_offenders(self):
+        with self.assertLogs('yatube.slow_queries') as logs:
+            self.client.get(reverse('posts:index'))
+        with tempfile.NamedTemporaryFile('w', delete=False) as log:
+            for line in logs.output:
+                log.write(line.split(':', 2)[2] + '\n')
+        try:
+            out = StringIO()
+            call_command('slow_queries', file=log.name, stdout=out)
+        finally:
+            os.remove(log.name)
+        self.assertIn('posts:index', out.getvalue())
@@ -0,0 +1,159 @@
+import gzip
+import os
+import shutil
+import tempfile
+from importlib import import_module, reload
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import NoReverseMatch, clear_url_caches, reverse
+from django.utils.http import http_date
+
+from core.views import accepts_gzip
+
+CSS = (
+    'body { background: url("../img/logo.png"); }\n' * 50
+).encode()
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256))
+
+
+def reload_urlconf():
+    """Маршрут статики выбирается при импорте urls по настройкам."""
+    clear_url_caches()
+    reload(import_module(settings.ROOT_URLCONF))
+
+
+class StaticPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.source = tempfile.mkdtemp()
+        cls.root = tempfile.mkdtemp()
+        for name, content in (('css/site.css', CSS), ('img/logo.png', PNG)):
+            path = os.path.join(cls.source, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(content)
+        cls.settings_override = override_settings(
+            STATICFILES_DIRS=[cls.source], STATIC_ROOT=cls.root,
+            STATIC_SERVE=True,
+        )
+        cls.settings_override.enable()
+        reload_urlconf()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        reload_urlconf()
+        shutil.rmtree(cls.source, ignore_errors=True)
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), 'rb') as file:
+            return file.read()
+
+    def test_manifest_and_gzip_siblings(self):
+        css = staticfiles_storage.stored_name('css/site.css')
+        logo = staticfiles_storage.stored_name('img/logo.png')
+        self.assertRegex(css, r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertIn(logo.split('/')[-1].encode(), self.read(css))
+        self.assertEqual(
+            gzip.decompress(self.read(f'{css}.gz')), self.read(css)
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.root, logo + '.gz')))
+
+    def test_hashed_file_is_immutable_and_precompressed(self):
+        css = staticfiles_storage.stored_name('css/site.css')
+        response = self.client.get(
+            f'/static/{css}', HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertEqual(
+            b''.join(response.streaming_content), self.read(f'{css}.gz')
+        )
+
+    def test_plain_requests(self):
+        css = staticfiles_storage.stored_name('css/site.css')
+        response = self.client.get(f'/static/{css}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.read(css))
+        response = self.client.get('/static/css/site.css')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(
+            self.client.get('/static/../settings.py').status_code, 404
+        )
+
+    def test_gzip_refused_by_q_value(self):
+        css = staticfiles_storage.stored_name('css/site.css')
+        response = self.client.get(
+            f'/static/{css}', HTTP_ACCEPT_ENCODING='gzip;q=0, br'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.read(css))
+
+    def test_not_modified(self):
+        """Файл без хеша перепроверяется по ETag и Last-Modified."""
+        response = self.client.get('/static/css/site.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        mtime = os.stat(os.path.join(self.root, 'css/site.css')).st_mtime
+        self.assertEqual(response['Last-Modified'], http_date(mtime))
+        response = self.client.get(
+            '/static/css/site.css', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            '/static/css/site.css', HTTP_IF_MODIFIED_SINCE=http_date(mtime)
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            '/static/css/site.css', HTTP_IF_NONE_MATCH='W/"0-0"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class StaticRouteTest(TestCase):
+    def tearDown(self):
+        reload_urlconf()
+
+    @override_settings(DEBUG=False, STATIC_SERVE=False)
+    def test_route_is_off_by_default(self):
+        reload_urlconf()
+        with self.assertRaises(NoReverseMatch):
+            reverse('static', args=['css/site.css'])
+
+    @override_settings(DEBUG=True, STATIC_SERVE=False)
+    def test_route_in_debug(self):
+        reload_urlconf()
+        self.assertEqual(
+            reverse('static', args=['css/site.css']), '/static/css/site.css'
+        )
+
+
+class AcceptsGzipTest(TestCase):
+    def test_q_values(self):
+        cases = {
+            'gzip': True,
+            'gzip, deflate, br': True,
+            'GZIP;q=0.5': True,
+            'gzip;q=0': False,
+            'gzip; q=0.0, br': False,
+            '*': True,
+            '*;q=0': False,
+            'gzip;q=1, *;q=0': True,
+            'gzip;q=0, *': False,
+            'br': False,
+            'x-gzip': False,
+            '': False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertIs(accepts_gzip(header), expected)
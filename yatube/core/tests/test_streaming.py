@@ -0,0 +1,95 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import loader
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.streaming import stream_template
+from posts.comments import fill_root_paths
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+class StreamingRenderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='streamer')
+        cls.group = Group.objects.create(title='Группа', slug='stream')
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Текст поста'
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(30)
+        )
+        fill_root_paths(Comment.objects.all())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def content(self, url):
+        response = self.client.get(url)
+        if response.streaming:
+            body = b''.join(response.streaming_content)
+        else:
+            body = response.content
+        return CSRF_INPUT.sub('', body.decode())
+
+    def test_same_html_as_render(self):
+        """Потоковый режим отдаёт ту же страницу, что и render()."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+            reverse('posts:post_edit', args=[self.post.pk]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                expected = self.content(url)
+                cache.clear()
+                with self.settings(STREAMING_RESPONSES=True):
+                    self.assertEqual(self.content(url), expected)
+
+    @override_settings(STREAMING_RESPONSES=True)
+    def test_streaming_response_headers(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertTrue(response.streaming)
+        self.assertIn('csrftoken', response.cookies)
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_head_is_sent_before_deferred_context(self):
+        """Шапка уходит до запросов тела, остаток — после."""
+        template = loader.get_template('posts/post_detail.html')
+        calls = []
+
+        def deferred():
+            calls.append(True)
+            return {'comments': self.post.comments.all()}
+        chunks = stream_template(template, {'post': self.post}, None, deferred)
+        head = next(chunks)
+        self.assertIn('<head>', head)
+        self.assertIn('Текст поста', head.split('</title>')[0])
+        self.assertNotIn('<main>', head)
+        self.assertEqual(calls, [])
+        rest = list(chunks)
+        self.assertEqual(calls, [True])
+        self.assertTrue(rest[0].lstrip().startswith('<main>'))
+        self.assertIn('Комментарий 29', rest[0])
+
+    def test_template_without_marker_is_one_chunk(self):
+        template = loader.get_template('includes/comment_list.html')
+        chunks = list(stream_template(
+            template, {'post': self.post}, None,
+            lambda: {'comments': self.post.comments.all()},
+        ))
+        self.assertEqual(len(chunks), 1)
+        self.assertIn('Комментарий 0', chunks[0])
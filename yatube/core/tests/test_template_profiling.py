@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.template import engines
+from django.template.base import Node, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import template_profiling
+from core.templatetags import user_filters
+
+
+def reset_template_loaders():
+    # Скомпилированные шаблоны держат фильтры, бывшие при компиляции.
+    for loader in engines['django'].engine.template_loaders:
+        if hasattr(loader, 'reset'):
+            loader.reset()
+
+
+@override_settings(TEMPLATE_PROFILING=True)
+class TemplateProfilingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        template_profiling.install(settings.TEMPLATE_PROFILING_LIBRARIES)
+        reset_template_loaders()
+
+    @classmethod
+    def tearDownClass(cls):
+        template_profiling.uninstall()
+        reset_template_loaders()
+        super().tearDownClass()
+
+    def profile(self, url):
+        response = self.client.get(url, HTTP_X_TEMPLATE_PROFILE='1')
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; charset=utf-8')
+        return response.content.decode().splitlines()
+
+    def test_folded_stacks(self):
+        """Профиль состоит из строк «стек значение» с шаблонами и тегами."""
+        lines = self.profile(reverse('users:login'))
+        stacks = {line.rsplit(' ', 1)[0] for line in lines}
+        for line in lines:
+            self.assertTrue(line.rsplit(' ', 1)[1].isdigit())
+        self.assertIn('template:users/login.html', stacks)
+        self.assertTrue(any(
+            stack.startswith(
+                'template:users/login.html;tag:ExtendsNode;template:base.html'
+            )
+            for stack in stacks
+        ))
+        self.assertTrue(any('tag:URLNode' in stack for stack in stacks))
+        self.assertTrue(any(
+            stack.endswith(';filter:addclass') for stack in stacks
+        ))
+
+    def test_without_header_page_is_rendered(self):
+        response = self.client.get(reverse('users:login'))
+        self.assertContains(response, '<html')
+        self.assertIsNone(template_profiling.current_profile())
+
+    def test_uninstall_restores_originals(self):
+        template_profiling.uninstall()
+        try:
+            self.assertFalse(hasattr(Template._render, 'profiled'))
+            self.assertFalse(hasattr(Node.render_annotated, 'profiled'))
+            self.assertFalse(hasattr(user_filters.addclass, 'profiled'))
+            self.assertIs(
+                user_filters.register.filters['addclass'],
+                user_filters.addclass
+            )
+        finally:
+            template_profiling.install(
+                settings.TEMPLATE_PROFILING_LIBRARIES
+            )
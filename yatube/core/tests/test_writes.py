@@ -0,0 +1,48 @@
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+
+from core import writes
+
+
+@override_settings(WRITE_RETRY_ATTEMPTS=3, WRITE_RETRY_BASE_DELAY=0.001)
+class RunWriteTest(TestCase):
+    def setUp(self):
+        writes.reset_lock_stats()
+
+    def failing(self, failures, message='database is locked'):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'ok'
+        return func, calls
+
+    def test_retries_lock_errors(self):
+        """Запись повторяется после блокировки и учитывается в метриках."""
+        func, calls = self.failing(2)
+        self.assertEqual(writes.run_write(func), 'ok')
+        self.assertEqual(len(calls), 3)
+        stats = writes.lock_stats()
+        self.assertEqual(stats['writes'], 1)
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['lock_errors'], 2)
+
+    def test_gives_up_after_attempts(self):
+        func, calls = self.failing(5)
+        with self.assertRaises(OperationalError):
+            writes.run_write(func)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(writes.lock_stats()['failures'], 1)
+
+    def test_other_errors_not_retried(self):
+        func, calls = self.failing(1, message='no such table: posts_post')
+        with self.assertRaises(OperationalError):
+            writes.run_write(func)
+        self.assertEqual(len(calls), 1)
+
+    @override_settings(WRITE_SINGLE_WRITER=True)
+    def test_single_writer(self):
+        self.assertEqual(writes.run_write(lambda: 42), 42)
+        self.assertEqual(writes.lock_stats()['writes'], 1)
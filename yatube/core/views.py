@@ -1,5 +1,21 @@
 # core/views.py
+import mimetypes
+import os
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition
+
+from .edge import FRAGMENTS, render_fragment
+from .metrics import REGISTRY
 
 
 def page_not_found(request, exception):
@@ -10,3 +26,120 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics_allowed(request):
+    """Доступ к /metrics: по токену ``METRICS_TOKEN``, если он задан,
+    иначе только прямое подключение с адреса из ``METRICS_ALLOWED_IPS``.
+
+    За прокси ``REMOTE_ADDR`` — адрес самого прокси, поэтому запрос с
+    ``X-Forwarded-For`` адресу не доверяет.
+    """
+    if settings.METRICS_TOKEN:
+        return constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''),
+            f'Bearer {settings.METRICS_TOKEN}'
+        )
+    return (
+        'HTTP_X_FORWARDED_FOR' not in request.META
+        and request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics(request):
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        REGISTRY.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@never_cache
+def fragment(request, name):
+    """Персональный фрагмент для ``<esi:include>`` оболочки страницы."""
+    if name not in FRAGMENTS:
+        raise Http404
+    try:
+        html = render_fragment(name, request, request.GET.dict())
+    except (TypeError, ValueError):
+        raise Http404
+    return HttpResponse(html)
+
+
+def accepts_gzip(header):
+    """Разрешает ли ``Accept-Encoding`` gzip с учётом q-значений:
+    ``gzip;q=0`` запрещает его, ``*`` действует, если gzip не назван.
+    """
+    weights = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    return weights.get('gzip', weights.get('*', 0.0)) > 0
+
+
+def static_file(path):
+    """Путь файла из ``STATIC_ROOT`` или 404."""
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path
+
+
+def static_etag(request, path):
+    stat = os.stat(static_file(path))
+    # Слабый: исходный файл и его .gz-копия равнозначны.
+    return f'W/"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def static_last_modified(request, path):
+    return datetime.fromtimestamp(
+        os.stat(static_file(path)).st_mtime, timezone.utc
+    )
+
+
+@condition(etag_func=static_etag, last_modified_func=static_last_modified)
+def serve_static(request, path):
+    """Собранная статика: хешированные файлы кешируются навсегда.
+
+    Если клиент принимает gzip (``accepts_gzip``) и рядом лежит
+    ``.gz``, отдаётся он. Остальные файлы клиент перепроверяет по
+    ``ETag`` и ``Last-Modified`` и получает 304, как у
+    ``django.views.static.serve``. Маршрут подключается при ``DEBUG``
+    или ``STATIC_SERVE``.
+    """
+    full_path = static_file(path)
+    content_type, _ = mimetypes.guess_type(full_path)
+    served_path, encoding = full_path, None
+    compressed = os.path.isfile(f'{full_path}.gz')
+    if compressed and accepts_gzip(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    ):
+        served_path, encoding = f'{full_path}.gz', 'gzip'
+    response = FileResponse(
+        open(served_path, 'rb'),
+        content_type=content_type or 'application/octet-stream'
+    )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if compressed:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if staticfiles_storage.is_hashed(path):
+        patch_cache_control(
+            response, public=True, immutable=True,
+            max_age=settings.STATIC_IMMUTABLE_MAX_AGE
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
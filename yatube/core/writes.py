@@ -0,0 +1,109 @@
+"""Координация записей в БД.
+
+SQLite допускает только одного писателя: при конкурентных запросах
+часть транзакций падает с ``database is locked``. Здесь записи
+выполняются в короткой транзакции с повторами и случайной задержкой,
+а побочные эффекты откладываются до коммита.
+"""
+import random
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+
+LOCK_ERROR_MESSAGES = ('database is locked', 'database table is locked')
+
+# Глобальный «писатель»: при WRITE_SINGLE_WRITER все записи процесса
+# выполняются по очереди и не конкурируют за блокировку SQLite.
+_writer_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    'writes': 0,
+    'lock_errors': 0,
+    'retries': 0,
+    'failures': 0,
+    'lock_wait_seconds': 0.0,
+    'queue_wait_seconds': 0.0,
+}
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return any(text in message for text in LOCK_ERROR_MESSAGES)
+
+
+def backoff_delay(attempt):
+    """Экспоненциальная задержка с полным джиттером."""
+    delay = min(
+        settings.WRITE_RETRY_MAX_DELAY,
+        settings.WRITE_RETRY_BASE_DELAY * (2 ** attempt)
+    )
+    return random.uniform(0, delay)
+
+
+def _record(**values):
+    with _stats_lock:
+        for name, value in values.items():
+            _stats[name] += value
+
+
+def lock_stats():
+    """Снимок счётчиков ожидания блокировок."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_lock_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = type(_stats[name])()
+
+
+def _run_atomic(func, args, kwargs, using):
+    if not settings.WRITE_SINGLE_WRITER:
+        with transaction.atomic(using=using):
+            return func(*args, **kwargs)
+    started = time.monotonic()
+    with _writer_lock:
+        _record(queue_wait_seconds=time.monotonic() - started)
+        with transaction.atomic(using=using):
+            return func(*args, **kwargs)
+
+
+def run_write(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Выполнить ``func`` в короткой транзакции с повторами.
+
+    Побочные эффекты (сброс кеша и т.п.) внутри ``func`` следует
+    регистрировать через ``transaction.on_commit``: при повторе
+    откатанная попытка их не запустит.
+    """
+    attempts = settings.WRITE_RETRY_ATTEMPTS
+    waited = 0.0
+    for attempt in range(attempts):
+        try:
+            result = _run_atomic(func, args, kwargs, using)
+        except OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            _record(lock_errors=1)
+            if attempt + 1 == attempts:
+                _record(failures=1, lock_wait_seconds=waited)
+                raise
+            delay = backoff_delay(attempt)
+            _record(retries=1)
+            time.sleep(delay)
+            waited += delay
+        else:
+            _record(writes=1, lock_wait_seconds=waited)
+            return result
+
+
+def retry_on_lock(func):
+    """Декоратор-обёртка над ``run_write``."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return run_write(func, *args, **kwargs)
+    return wrapper
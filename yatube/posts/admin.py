@@ -1,17 +1,47 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from . import moderation
+from .models import (
+    ArchivedPost, Comment, Follow, Group, ModerationJob, Post,
+)
+
+
+def moderation_action(name, action, description):
+    """Действие админки, применяющее ``action`` пачками."""
+    def run(modeladmin, request, queryset):
+        done = moderation.start_job(queryset, action)
+        if done is None:
+            modeladmin.message_user(
+                request, 'Задание запущено в фоне, прогресс — в журнале.'
+            )
+        else:
+            modeladmin.message_user(request, f'Обработано записей: {done}.')
+    run.__name__ = name
+    run.short_description = description
+    return run
+
+
+MODERATION_ACTIONS = (
+    moderation_action('hide_selected', 'hide', 'Скрыть выбранные'),
+    moderation_action('unhide_selected', 'unhide', 'Показать выбранные'),
+    moderation_action(
+        'delete_in_batches', 'delete', 'Удалить выбранные пачками'
+    ),
+)
 
 
 class PostAdmin(admin.ModelAdmin):
     # Перечисляем поля, которые должны отображаться в админке
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group', 'image')
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'image', 'is_hidden'
+    )
     list_editable = ('group',)
     # Добавляем интерфейс для поиска по тексту постов
-    search_fields = ('text',)
+    search_fields = ('text', 'author__username')
     # Добавляем возможность фильтрации по дате
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_hidden')
     list_editable = ('group',)
+    actions = MODERATION_ACTIONS
     empty_value_display = '-пусто-'
 
 
@@ -21,8 +51,19 @@ class GroupAdmin(admin.ModelAdmin):
 
 
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'post', 'author', 'text', 'created')
-    list_filter = ('created',)
+    list_display = ('pk', 'post', 'author', 'text', 'created', 'is_hidden')
+    search_fields = ('text', 'author__username')
+    list_filter = ('created', 'is_hidden')
+    list_select_related = ('post', 'author')
+    actions = MODERATION_ACTIONS
+    empty_value_display = '-пусто-'
+
+
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group', 'archived')
+    search_fields = ('text', 'author__username')
+    list_filter = ('pub_date', 'is_hidden')
+    actions = MODERATION_ACTIONS
     empty_value_display = '-пусто-'
 
 
@@ -32,7 +73,17 @@ class FollowAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class ModerationJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'model', 'action', 'done', 'last_pk', 'finished', 'updated'
+    )
+    list_filter = ('finished', 'action')
+    exclude = ('query',)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Follow, FollowAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ArchivedPost, ArchivedPostAdmin)
+admin.site.register(ModerationJob, ModerationJobAdmin)
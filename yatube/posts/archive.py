@@ -0,0 +1,300 @@
+"""Перенос старых постов в холодные таблицы и чтение из них.
+
+Почти все чтения приходятся на первые страницы лент, поэтому посты
+старше ``POST_ARCHIVE_AFTER_DAYS`` переносятся пачками в
+``ArchivedPost``/``ArchivedComment``. Горячая таблица и её индексы
+остаются небольшими, а ленты и ``post_detail`` дочитывают архив,
+когда страница или id выходят за пределы горячих данных. Число
+архивных постов ленты кешируется до следующего изменения архива.
+"""
+import hashlib
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+from django.db.models import Subquery
+from django.http import Http404
+from django.utils import timezone
+
+from core.writes import run_write
+
+from . import counters
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+ARCHIVE_VERSION_KEY = 'archive_version'
+
+
+def _bump_archive_version():
+    try:
+        cache.incr(ARCHIVE_VERSION_KEY)
+    except ValueError:
+        cache.set(ARCHIVE_VERSION_KEY, 1, None)
+
+
+def archive_changed():
+    """Сбрасывает кешированные числа архивных постов сейчас и после
+    коммита."""
+    _bump_archive_version()
+    transaction.on_commit(_bump_archive_version)
+
+
+def cold_count(queryset):
+    """``queryset.count()`` архивной выборки из кеша."""
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        # Например, лента подписок без подписок: ``author_id__in=[]``.
+        return 0
+    version = cache.get(ARCHIVE_VERSION_KEY, 0)
+    digest = hashlib.md5(sql.encode()).hexdigest()
+    key = f'archive_count:{version}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.ARCHIVE_COUNT_TIMEOUT)
+    return count
+
+
+def copy_instance(obj, model):
+    """Несохранённая копия ``obj`` в виде ``model`` по совпадающим полям."""
+    names = {field.attname for field in obj._meta.concrete_fields}
+    return model(**{
+        field.attname: getattr(obj, field.attname)
+        for field in model._meta.concrete_fields
+        if field.attname in names
+    })
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.POST_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def _move_to_archive(ids):
+    posts = Post.objects.filter(pk__in=ids)
+    comments = Comment.objects.filter(post_id__in=ids)
+    ArchivedPost.objects.bulk_create(
+        copy_instance(post, ArchivedPost) for post in posts
+    )
+    ArchivedComment.objects.bulk_create(
+        copy_instance(comment, ArchivedComment) for comment in comments
+    )
+    # bulk_create не шлёт сигналов.
+    archive_changed()
+    # Счётчики уехали в архив вместе с постами, которые сейчас удалятся.
+    with counters.paused():
+        comments.delete()
+        posts.delete()
+
+
+def archive_posts(cutoff, batch_size=None):
+    """Переносит посты старше ``cutoff`` пачками, отдавая размер пачки.
+
+    Каждая пачка — отдельная короткая транзакция, чтобы не держать
+    блокировку записи SQLite долго.
+    """
+    batch_size = batch_size or settings.POST_ARCHIVE_BATCH_SIZE
+    # Пост, возвращённый из архива правкой или комментарием, остаётся
+    # горячим, пока не пролежит без изменений столько же.
+    old_posts = Post.objects.filter(
+        pub_date__lt=cutoff, updated__lt=cutoff
+    ).order_by('pub_date')
+    while True:
+        ids = list(old_posts.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        run_write(_move_to_archive, ids)
+        yield len(ids)
+
+
+def _move_to_hot(archived):
+    post = copy_instance(archived, Post)
+    post.save(force_insert=True)
+    comments = list(archived.comments.all())
+    copies = [copy_instance(comment, Comment) for comment in comments]
+    Comment.objects.bulk_create(copies)
+    # auto_now_add перезаписал даты при вставке — возвращаем исходные.
+    Post.objects.filter(pk=post.pk).update(pub_date=archived.pub_date)
+    post.pub_date = archived.pub_date
+    for copy, comment in zip(copies, comments):
+        copy.created = comment.created
+    # bulk_update делит CASE на пачки в пределах числа параметров SQLite.
+    Comment.objects.bulk_update(copies, ['created'])
+    archived.delete()
+    return post
+
+
+def restore_post(archived):
+    """Возвращает пост из архива в горячую таблицу."""
+    return run_write(_move_to_hot, archived)
+
+
+def get_post(post_id):
+    """Пост из горячей таблицы или из архива, иначе 404."""
+    post = Post.objects.filter(pk=post_id, is_hidden=False).first()
+    if post is None:
+        post = ArchivedPost.objects.filter(
+            pk=post_id, is_hidden=False
+        ).first()
+    if post is None:
+        raise Http404('Пост не найден.')
+    return post
+
+
+def hot_instance(post):
+    """Пост для формы: архивный — несохранённой копией ``Post``.
+
+    Копия с тем же id после ``write_hot`` сохраняется поверх
+    возвращённой из архива строки.
+    """
+    if isinstance(post, ArchivedPost):
+        post = copy_instance(post, Post)
+        # Иначе auto_now_add перезапишет дату публикации.
+        post._state.adding = False
+    return post
+
+
+def _write_hot(post, func, args):
+    if isinstance(post, ArchivedPost):
+        _move_to_hot(post)
+    return func(*args)
+
+
+def write_hot(post, func, *args):
+    """Запись ``func(*args)`` о посте ``post`` в одной транзакции:
+    архивный пост перед ней возвращается в горячую таблицу.
+
+    Вызывать только после проверки прав и формы, чтобы чтение
+    или чужой запрос не возвращали пост из архива.
+    """
+    return run_write(_write_hot, post, func, args)
+
+
+class TieredPostList:
+    """Горячие и архивные посты в общем порядке ``-pub_date, -pk``.
+
+    Горячие посты новее архивных, кроме возвращённых из архива правкой
+    или комментарием (``write_hot``). Такие посты (``stale``) не новее
+    самого нового архивного; их немного, и они сливаются с архивом, а
+    остальные горячие идут перед ним. Архив читается, только когда срез
+    выходит за пределы свежих горячих постов, а его размер берётся из
+    кеша (``cold_count``).
+    """
+
+    def __init__(self, hot, cold):
+        self.hot = hot
+        self.cold = cold
+        self._hot_count = None
+        self._stale = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count() + cold_count(self.cold)
+
+    def __len__(self):
+        return self.count()
+
+    def newest_cold(self):
+        return Subquery(
+            self.cold.order_by('-pub_date').values('pub_date')[:1]
+        )
+
+    def stale(self):
+        """``(pub_date, pk)`` горячих постов не новее архива по убыванию."""
+        if self._stale is None:
+            self._stale = list(self.hot.filter(
+                pub_date__lte=self.newest_cold()
+            ).values_list('pub_date', 'pk'))
+        return self._stale
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            items = self[index:index + 1]
+            if not items:
+                raise IndexError(index)
+            return items[0]
+        start = index.start or 0
+        stop = index.stop
+        if start < 0 or (stop is not None and stop < 0) or index.step:
+            raise ValueError('Поддерживаются только прямые срезы.')
+        stale = self.stale()
+        fresh_count = self.hot_count() - len(stale)
+        items = []
+        if start < fresh_count:
+            fresh = self.hot
+            if stale:
+                fresh = fresh.filter(pub_date__gt=self.newest_cold())
+            items.extend(fresh[start:stop])
+        if stop is None or stop > fresh_count:
+            items.extend(self._merged(
+                max(start - fresh_count, 0),
+                None if stop is None else stop - fresh_count,
+            ))
+        return items
+
+    def _merged(self, start, stop):
+        """Срез слияния ``stale`` с архивом.
+
+        Архив читается со строки ``start - len(stale) - 1``: до неё не
+        больше ``start`` постов слияния, а поздние посты новее неё уже
+        позади.
+        """
+        stale = self.stale()
+        skip = max(start - len(stale), 0)
+        if skip:
+            cold = list(self.cold[skip - 1:stop])
+            if not cold:
+                return []
+            last = cold.pop(0)
+            behind = 0
+            while behind < len(stale) and (
+                stale[behind] > (last.pub_date, last.pk)
+            ):
+                behind += 1
+            stale = stale[behind:]
+            position = skip + behind
+        else:
+            cold = list(self.cold[:stop])
+            position = 0
+        rows = heapq.merge(
+            ((post.pub_date, post.pk, post) for post in cold),
+            ((pub_date, pk, None) for pub_date, pk in stale),
+            reverse=True,
+        )
+        page = list(islice(
+            rows, start - position, None if stop is None else stop - position
+        ))
+        posts = self.hot.in_bulk(
+            [pk for _, pk, post in page if post is None]
+        )
+        page = [post or posts.get(pk) for _, pk, post in page]
+        # Горячий пост могли удалить между запросами.
+        return [post for post in page if post is not None]
+
+
+def tiered_posts(**filters):
+    """Видимые посты с фильтром ``filters`` из горячей таблицы и архива.
+
+    Порядок ``-pub_date, -pk`` совпадает с лентами ``posts.timelines``:
+    посты с одной датой не меняются местами между страницами.
+    """
+    filters.setdefault('is_hidden', False)
+    ordering = ('-pub_date', '-pk')
+    # Карточка, которой нет в кеше, выводит автора и группу.
+    related = ('author', 'group')
+    return TieredPostList(
+        Post.objects.filter(**filters).select_related(*related)
+        .order_by(*ordering),
+        ArchivedPost.objects.filter(**filters).select_related(*related)
+        .order_by(*ordering),
+    )
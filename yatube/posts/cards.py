@@ -0,0 +1,42 @@
+"""Кеш готового HTML карточек постов.
+
+Ключ карточки содержит модель, id, отметку ``updated`` и число
+комментариев поста, поэтому изменённый пост получает новый ключ, а
+старый фрагмент просто истекает.
+``updated`` обновляют сохранение поста, а также изменение группы и
+имени автора (см. ``posts.signals``). Лента собирает страницу из
+фрагментов одним ``cache.get_many``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+CARD_TEMPLATE = 'includes/post_list.html'
+
+
+def card_key(post):
+    # comment_count меняется через update() и не сдвигает updated.
+    version = int(post.updated.timestamp() * 1e6)
+    return (
+        f'post_card:{post._meta.label_lower}:{post.pk}:{version}:'
+        f'{post.comment_count}'
+    )
+
+
+def render_card(post):
+    return render_to_string(CARD_TEMPLATE, {'post': post})
+
+
+def prefetch_cards(posts):
+    """HTML карточек ``posts`` по ключам: недостающие рендерятся и
+    кладутся в кеш одним ``set_many``."""
+    posts = {card_key(post): post for post in posts}
+    cards = cache.get_many(posts)
+    missing = {
+        key: render_card(post)
+        for key, post in posts.items() if key not in cards
+    }
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return cards
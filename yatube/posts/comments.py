@@ -0,0 +1,161 @@
+"""Ветки комментариев с материализованным путём.
+
+Путь комментария — пути предков плюс его собственный сегмент из
+времени создания и id в base36 фиксированной ширины. Поэтому
+сортировка по ``path`` даёт обход дерева в глубину с детьми по времени,
+а вся ветка — это один диапазон ``[path, path + '~')`` индекса
+``(post, path)``: без рекурсивных запросов по ``parent``.
+
+Страница комментариев — следующие ``COMMENTS_PER_PAGE`` строк в
+порядке ``path`` после курсора (пути последней строки), считая и
+ответы: одна большая ветка делится между страницами и не раздувает
+первую. Глубина ограничена ``COMMENT_MAX_DEPTH``: ответ на самый
+глубокий комментарий становится его соседом.
+"""
+import re
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.utils.http import int_to_base36
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Микросекунды — 11 знаков base36 (до ~6000 года), id — 7 знаков.
+TIME_WIDTH = 11
+ID_WIDTH = 7
+SEGMENT_LENGTH = TIME_WIDTH + ID_WIDTH
+# Символ после всех цифр base36: верхняя граница диапазона ветки.
+PATH_END = '~'
+
+_CURSOR = re.compile(r'(?:[0-9a-z]{%d})+' % SEGMENT_LENGTH)
+
+
+def segment(comment):
+    delta = comment.created - EPOCH
+    microseconds = (
+        (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+    )
+    return (
+        int_to_base36(microseconds).rjust(TIME_WIDTH, '0')
+        + int_to_base36(comment.pk).rjust(ID_WIDTH, '0')
+    )
+
+
+def reply_parent(parent):
+    """Родитель с учётом предела глубины."""
+    if parent is not None and parent.depth >= settings.COMMENT_MAX_DEPTH:
+        return parent.parent
+    return parent
+
+
+def save_comment(comment, parent=None):
+    """Сохраняет комментарий и записывает его путь в ветке.
+
+    Путь зависит от id, поэтому нужна вторая запись; вызывать внутри
+    одной транзакции (``run_write``).
+    """
+    parent = reply_parent(parent)
+    comment.parent = parent
+    comment.save()
+    comment.path = (parent.path if parent else '') + segment(comment)
+    comment.depth = parent.depth + 1 if parent else 0
+    type(comment).objects.filter(pk=comment.pk).update(
+        path=comment.path, depth=comment.depth
+    )
+    return comment
+
+
+def save_reply(comment, parent_id=''):
+    """``save_comment`` с родителем по id из формы: только комментарий
+    того же поста, иначе комментарий становится корнем."""
+    parent = None
+    if str(parent_id).isdigit():
+        parent = type(comment).objects.filter(
+            post_id=comment.post_id, pk=parent_id
+        ).first()
+    return save_comment(comment, parent)
+
+
+def fill_root_paths(queryset, batch_size=1000):
+    """Пути для комментариев, созданных в обход ``save_comment``
+    (``bulk_create``): все они считаются корнями. Обходит их пачками
+    по ``pk``."""
+    queryset = queryset.filter(path='').order_by('pk')
+    last_pk = 0
+    done = 0
+    while True:
+        comments = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not comments:
+            return done
+        for comment in comments:
+            comment.path = segment(comment)
+            comment.depth = 0
+        queryset.model.objects.bulk_update(comments, ['path', 'depth'])
+        last_pk = comments[-1].pk
+        done += len(comments)
+
+
+def subtree(comment):
+    """Комментарий со всеми ответами одним диапазонным запросом."""
+    return type(comment).objects.filter(
+        post_id=comment.post_id,
+        path__gte=comment.path,
+        path__lt=comment.path + PATH_END,
+    ).order_by('path')
+
+
+def path_prefixes(path):
+    """Пути комментария и всех его предков."""
+    return [
+        path[:end] for end in range(SEGMENT_LENGTH, len(path) + 1,
+                                    SEGMENT_LENGTH)
+    ]
+
+
+def comment_range(post, cursor=None, limit=None):
+    """Запрос страницы комментариев после ``cursor`` и курсор следующей.
+
+    ``limit`` ограничивает число строк вместе с ответами. Ветки скрытых
+    комментариев, начатые на прошлых страницах, исключаются: их корень
+    — среди предков курсора. ValueError — испорченный курсор.
+    """
+    limit = limit or settings.COMMENTS_PER_PAGE
+    rows = post.comments.order_by('path')
+    if cursor:
+        if not _CURSOR.fullmatch(cursor):
+            raise ValueError(cursor)
+        rows = rows.filter(path__gt=cursor)
+        hidden = post.comments.filter(
+            path__in=path_prefixes(cursor), is_hidden=True
+        ).values_list('path', flat=True)
+        for path in hidden:
+            rows = rows.exclude(path__gte=path, path__lt=path + PATH_END)
+    paths = list(rows.values_list('path', flat=True)[:limit + 1])
+    if not paths:
+        return post.comments.none(), None
+    next_cursor = paths[limit - 1] if len(paths) > limit else None
+    return rows.filter(path__lte=paths[:limit][-1]), next_cursor
+
+
+def comment_page(post, cursor=None, limit=None):
+    """Видимые комментарии страницы ``comment_range`` и курсор."""
+    comments, next_cursor = comment_range(post, cursor, limit)
+    return visible(comments.select_related('author')), next_cursor
+
+
+def visible(comments, get=getattr):
+    """Комментарии без скрытых и их ответов; ``comments`` упорядочены.
+
+    ``get`` читает поле: ``getattr`` для моделей, ``dict.get`` для
+    строк ``values()``.
+    """
+    result = []
+    hidden = None
+    for comment in comments:
+        path = get(comment, 'path')
+        if hidden and path.startswith(hidden):
+            continue
+        if get(comment, 'is_hidden'):
+            hidden = path
+            continue
+        result.append(comment)
+    return result
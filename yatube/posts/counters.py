@@ -0,0 +1,90 @@
+"""Денормализованное число комментариев поста.
+
+``Post.comment_count`` меняется одним ``UPDATE ... SET comment_count =
+comment_count ± 1`` в той же транзакции, что и сам комментарий
+(сигналы в ``posts.signals``), поэтому ленты показывают число без
+запроса на каждый пост. Расхождения после массовых операций в обход
+сигналов (``bulk_create``, сырой SQL) исправляет ``reconcile``.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.writes import run_write
+
+_local = threading.local()
+
+
+@contextmanager
+def paused():
+    """Не трогать счётчики: например, пост всё равно удаляется."""
+    previous = getattr(_local, 'paused', False)
+    _local.paused = True
+    try:
+        yield
+    finally:
+        _local.paused = previous
+
+
+def is_paused():
+    return getattr(_local, 'paused', False)
+
+
+def comment_added(model, post_id):
+    model.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + 1
+    )
+
+
+def comment_removed(model, post_id):
+    # Условие не даёт уйти в минус, если счётчик уже разошёлся.
+    model.objects.filter(pk=post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+def real_count(comment_model):
+    """Подзапрос с настоящим числом комментариев поста."""
+    counts = comment_model.objects.filter(post=OuterRef('pk')).order_by()
+    counts = counts.values('post').annotate(total=Count('pk'))
+    return Coalesce(
+        Subquery(counts.values('total'), output_field=IntegerField()), 0
+    )
+
+
+def fix_counts(model, comment_model, ids):
+    """Пересчитывает разошедшиеся счётчики постов ``ids``."""
+    drifted = list(
+        model.objects.filter(pk__in=ids)
+        .annotate(real=Count('comments'))
+        .exclude(comment_count=F('real'))
+        .values_list('pk', flat=True)
+    )
+    if drifted:
+        model.objects.filter(pk__in=drifted).update(
+            comment_count=real_count(comment_model)
+        )
+    return len(drifted)
+
+
+def reconcile(model, comment_model, batch_size=1000, queryset=None):
+    """Пересчитывает разошедшиеся счётчики пачками по ``pk``.
+
+    Отдаёт число исправленных постов в каждой пачке; каждая пачка —
+    отдельная короткая транзакция.
+    """
+    if queryset is None:
+        queryset = model.objects.all()
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk
+        )
+        ids = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        last_pk = ids[-1]
+        yield run_write(fix_counts, model, comment_model, ids)
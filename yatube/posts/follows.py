@@ -0,0 +1,134 @@
+"""Кеш графа подписок.
+
+Для каждого пользователя в кеше лежит отсортированный массив id
+авторов, на которых он подписан (``array('l')`` — несколько байт на
+подписку вместо объектов ORM). Кнопка подписки проверяет его бинарным
+поиском, а лента подписок фильтрует посты по ``author_id IN (...)``
+без соединения с ``Follow``.
+
+Любое изменение ``Follow`` (см. ``posts.signals``) сразу удаляет
+массив пользователя, а после коммита перечитывает его из БД: читатель,
+успевший закешировать старое состояние до коммита, не оставит его
+надолго.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+
+from core.writes import run_write
+
+from .models import Follow, User
+
+
+def graph_key(user_id):
+    return f'follow_graph:{user_id}'
+
+
+def store(user_id, author_ids):
+    ids = array('l', sorted(author_ids))
+    cache.set(graph_key(user_id), ids, settings.FOLLOW_GRAPH_CACHE_TIMEOUT)
+    return ids
+
+
+def load(user_id):
+    """Читает подписки из БД и кладёт их в кеш."""
+    return store(user_id, Follow.objects.filter(
+        user_id=user_id
+    ).values_list('author_id', flat=True))
+
+
+def followed_ids(user):
+    """Отсортированные id авторов, на которых подписан ``user``."""
+    if not user.is_authenticated:
+        return array('l')
+    ids = cache.get(graph_key(user.pk))
+    if ids is None:
+        ids = load(user.pk)
+    return ids
+
+
+def is_following(user, author_id):
+    ids = followed_ids(user)
+    index = bisect_left(ids, author_id)
+    return index < len(ids) and ids[index] == author_id
+
+
+def changed(user_id):
+    """Сбрасывает подписки ``user_id`` сейчас и перечитывает после
+    коммита."""
+    cache.delete(graph_key(user_id))
+    transaction.on_commit(lambda: load(user_id))
+
+
+def follow(user, author):
+    """Подписывает ``user`` на ``author``; False, если уже подписан."""
+    if user == author or is_following(user, author.pk):
+        return False
+    return run_write(
+        Follow.objects.get_or_create, user=user, author=author
+    )[1]
+
+
+def unfollow(user, author):
+    """Отписывает ``user`` от ``author``; False, если не был подписан."""
+    deleted, _ = run_write(
+        Follow.objects.filter(user=user, author=author).delete
+    )
+    return bool(deleted)
+
+
+def _apply_batch(user, follow_ids, unfollow_ids):
+    Follow.objects.bulk_create(
+        [Follow(user=user, author_id=author_id) for author_id in follow_ids],
+        ignore_conflicts=True,
+    )
+    if unfollow_ids:
+        # Один DELETE без выборки и сигналов post_delete на каждую
+        # строку: у Follow нет зависимых связей, а кеш follow_many
+        # обновляет сам одним чтением. Число id ограничено
+        # FOLLOW_BATCH_MAX, так что параметров немного.
+        meta = Follow._meta
+        user_column = meta.get_field('user').column
+        author_column = meta.get_field('author').column
+        connection = connections[router.db_for_write(Follow)]
+        quote = connection.ops.quote_name
+        placeholders = ', '.join(['%s'] * len(unfollow_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote(meta.db_table)} '
+                f'WHERE {quote(user_column)} = %s '
+                f'AND {quote(author_column)} IN ({placeholders})',
+                [user.pk, *unfollow_ids],
+            )
+
+
+def follow_many(user, follow=(), unfollow=()):
+    """Подписывает и отписывает ``user`` по спискам имён за одну
+    транзакцию; отписка применяется после подписки.
+
+    Возвращает новое состояние: имена всех авторов ``user`` и имена из
+    запроса, которых нет среди пользователей.
+    """
+    names = set(follow) | set(unfollow)
+    authors = dict(
+        User.objects.filter(username__in=names).values_list('username', 'pk')
+    )
+    follow_ids = {
+        authors[name] for name in follow
+        if name in authors and authors[name] != user.pk
+    }
+    unfollow_ids = {authors[name] for name in unfollow if name in authors}
+    run_write(_apply_batch, user, follow_ids - unfollow_ids, unfollow_ids)
+    # bulk_create не шлёт post_save: кеш обновляется тем же чтением,
+    # что и ответ.
+    following = dict(Follow.objects.filter(user=user).values_list(
+        'author__username', 'author_id'
+    ))
+    store(user.pk, following.values())
+    return {
+        'following': sorted(following),
+        'unknown': sorted(names - set(authors)),
+    }
@@ -0,0 +1,49 @@
+"""Персональные фрагменты страниц постов (см. ``core.edge``).
+
+Параметры приходят из ``GET`` публичного ``/fragments/``: неверные
+дают ValueError (ответ 404), а не NoReverseMatch в шаблоне.
+"""
+import re
+
+from core.edge import fragment
+
+from .forms import CommentForm
+from .recommendations import suggestions_for
+
+_ID = re.compile(r'[0-9]{1,18}')
+_USERNAME = re.compile(r'[\w.@+-]{1,150}')
+
+
+def id_param(value):
+    if not _ID.fullmatch(str(value)):
+        raise ValueError(value)
+    return int(value)
+
+
+def username_param(value):
+    if not _USERNAME.fullmatch(value):
+        raise ValueError(value)
+    return value
+
+
+@fragment('follow_button', 'fragments/follow_button.html')
+def follow_button(request, username, author_id):
+    return {
+        'username': username_param(username),
+        'author_id': id_param(author_id),
+    }
+
+
+@fragment('comment_form', 'fragments/comment_form.html')
+def comment_form(request, post_id):
+    return {'post_id': id_param(post_id), 'form': CommentForm()}
+
+
+@fragment('post_edit_link', 'fragments/post_edit_link.html')
+def post_edit_link(request, post_id, author):
+    return {'post_id': id_param(post_id), 'author': author}
+
+
+@fragment('who_to_follow', 'fragments/who_to_follow.html')
+def who_to_follow(request):
+    return {'suggested_authors': suggestions_for(request.user)}
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_cutoff, archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архивные таблицы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POST_ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше указанного числа дней.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POST_ARCHIVE_BATCH_SIZE,
+            help='Сколько постов переносить в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        total = 0
+        for moved in archive_posts(cutoff, options['batch_size']):
+            total += moved
+            self.stdout.write(f'Перенесено постов: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Архивация завершена, всего постов: {total}'
+        ))
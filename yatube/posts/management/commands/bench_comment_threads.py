@@ -0,0 +1,127 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts.comments import SEGMENT_LENGTH, segment, subtree
+from posts.management.commands.generate_data import keep_dates
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+MAX_BENCH_DEPTH = Comment._meta.get_field('path').max_length // SEGMENT_LENGTH
+
+
+def build_thread(post, author, depth, fanout):
+    """Полное дерево ответов глубины ``depth``; возвращает корень."""
+    next_pk = (Comment.objects.order_by('-pk').values_list(
+        'pk', flat=True).first() or 0) + 1
+    started = timezone.now()
+    level, parent_of = [None], {}
+    for number in range(depth + 1):
+        children = []
+        for parent in level:
+            for _ in range(1 if parent is None else fanout):
+                comment = Comment(
+                    pk=next_pk, post=post, author=author, parent=parent,
+                    text=f'Ответ {next_pk}', depth=number,
+                    created=started + timedelta(microseconds=next_pk),
+                )
+                comment.path = (parent.path if parent else '') + segment(
+                    comment
+                )
+                parent_of[comment.pk] = parent
+                children.append(comment)
+                next_pk += 1
+        with keep_dates(Comment._meta.get_field('created')):
+            Comment.objects.bulk_create(children)
+        level = children
+    return Comment.objects.get(post=post, depth=0)
+
+
+def by_node(comment):
+    """Список смежности: запрос детей для каждого узла."""
+    result = [comment]
+    for child in comment.replies.order_by('created', 'pk'):
+        result.extend(by_node(child))
+    return result
+
+
+def by_level(root):
+    """Список смежности: один запрос на уровень, дерево — в Python."""
+    children, level = {}, [root]
+    while level:
+        level = list(
+            Comment.objects.filter(parent__in=level).order_by('created', 'pk')
+        )
+        for comment in level:
+            children.setdefault(comment.parent_id, []).append(comment)
+    result, stack = [], [root]
+    while stack:
+        comment = stack.pop()
+        result.append(comment)
+        stack.extend(reversed(children.get(comment.pk, [])))
+    return result
+
+
+def by_path(root):
+    """Материализованный путь: один диапазонный запрос."""
+    return list(subtree(root))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает загрузку глубокой ветки комментариев по списку '
+        'смежности и по материализованному пути. Данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=8)
+        parser.add_argument('--fanout', type=int, default=2)
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not 0 < options['depth'] < MAX_BENCH_DEPTH:
+            raise CommandError(
+                f'Глубина должна быть от 1 до {MAX_BENCH_DEPTH - 1}.'
+            )
+        with transaction.atomic():
+            author = User.objects.create(username='bench_comment_threads')
+            post = Post.objects.create(author=author, text='Ветка')
+            root = build_thread(
+                post, author, options['depth'], options['fanout']
+            )
+            self.compare(root, options['rounds'])
+            transaction.set_rollback(True)
+
+    def compare(self, root, rounds):
+        loaders = (
+            ('по узлу', by_node), ('по уровню', by_level), ('путь', by_path)
+        )
+        expected = None
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        for name, loader in loaders:
+            best = float('inf')
+            for _ in range(rounds):
+                queries.clear()
+                with connection.execute_wrapper(count_queries):
+                    started = time.perf_counter()
+                    comments = loader(root)
+                    best = min(best, time.perf_counter() - started)
+            order = [comment.pk for comment in comments]
+            if expected is None:
+                expected = order
+            elif order != expected:
+                raise CommandError(f'{name}: другой порядок комментариев.')
+            self.stdout.write(
+                f'{name:10} {best * 1000:9.2f} мс  '
+                f'{len(queries):5} запросов  {len(order)} комментариев'
+            )
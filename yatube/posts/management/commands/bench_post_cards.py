@@ -0,0 +1,79 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Engine, engines
+from django.utils import timezone
+
+from posts.models import Post
+
+User = get_user_model()
+
+INCLUDE_LOOP = (
+    "{% for post in posts %}"
+    "{% include 'includes/post_list.html' %}"
+    "{% endfor %}"
+)
+TAG_LOOP = (
+    "{% load post_cards %}"
+    "{% for post in posts %}"
+    "{% post_card post %}"
+    "{% endfor %}"
+)
+
+
+def production_engine():
+    """Движок проекта с кешированным загрузчиком, как при DEBUG = False."""
+    engine = engines['django'].engine
+    return Engine(
+        dirs=engine.dirs,
+        loaders=[('django.template.loaders.cached.Loader', engine.loaders)],
+        libraries=engine.libraries,
+    )
+
+
+def sample_posts(count):
+    """Несохранённые посты: замер не зависит от базы."""
+    author = User(username='bench', first_name='Иван', last_name='Петров')
+    now = timezone.now()
+    return [
+        Post(pk=number, text=f'Текст поста {number}', author=author,
+             pub_date=now)
+        for number in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стоимость рендеринга карточки поста через '
+        '{% include %} в цикле и через тег {% post_card %}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        engine = production_engine()
+        context = Context({'posts': sample_posts(options['posts'])})
+        templates = {
+            'include': engine.from_string(INCLUDE_LOOP),
+            'post_card': engine.from_string(TAG_LOOP),
+        }
+        html = {name: tpl.render(context) for name, tpl in templates.items()}
+        if html['include'] != html['post_card']:
+            raise CommandError('HTML карточек различается.')
+        # Раунды чередуются, в зачёт идёт лучший: так меньше шума.
+        best = dict.fromkeys(templates, float('inf'))
+        for _ in range(options['rounds']):
+            for name, tpl in templates.items():
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    tpl.render(context)
+                best[name] = min(best[name], time.perf_counter() - started)
+        renders = options['repeat'] * options['posts']
+        for name, elapsed in best.items():
+            self.stdout.write(
+                f'{name:10} {elapsed / renders * 1e6:8.1f} мкс на пост'
+            )
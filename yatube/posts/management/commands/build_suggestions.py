@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_suggestions
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «на кого подписаться» по таблице '
+        'подписок. Запускается по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=settings.SUGGESTIONS_TOP,
+            help='Сколько предложений хранить на пользователя.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько пользователей сохранять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        done = 0
+        for count in build_suggestions(
+            options['top'], options['batch_size']
+        ):
+            done += count
+            self.stdout.write(f'Пользователей обработано: {done}')
+        self.stdout.write(f'Готово, пользователей: {done}')
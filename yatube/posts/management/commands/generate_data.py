@@ -0,0 +1,268 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.comments import fill_root_paths
+from posts.counters import reconcile
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+SENTENCE_POOL = 2000
+
+
+@contextmanager
+def keep_dates(*fields):
+    """Отключает auto_now и auto_now_add, чтобы bulk_create сохранил
+    наши даты.
+
+    Меняет поле модели для всего процесса — только для команд.
+    """
+    saved = [
+        (field, field.auto_now, field.auto_now_add) for field in fields
+    ]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует большой воспроизводимый набор данных: пользователей, '
+        'группы, посты, комментарии и подписки со степенным '
+        'распределением активности авторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Параметр Парето: чем меньше, тем сильнее перекос.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=730,
+            help='За сколько дней распределить даты публикаций.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--prefix', default='gen',
+            help='Префикс имён пользователей и слагов групп.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом `{prefix}` уже существуют.'
+            )
+        self.sentences = [
+            self.faker.sentence(nb_words=10) for _ in range(SENTENCE_POOL)
+        ]
+        users = self.phase('users', self.create_users)
+        groups = self.phase('groups', self.create_groups)
+        # Популярность автора: и постов, и подписчиков у него больше.
+        weights = [
+            self.rng.paretovariate(options['alpha']) for _ in users
+        ]
+        with keep_dates(
+            Post._meta.get_field('pub_date'),
+            Post._meta.get_field('updated'),
+            Comment._meta.get_field('created'),
+        ):
+            posts = self.phase(
+                'posts', self.create_posts, users, weights, groups
+            )
+            self.phase(
+                'comments', self.create_comments, users, weights, posts
+            )
+        self.phase('comment paths', self.fill_comment_paths, posts)
+        self.phase('comment counts', self.count_comments, posts)
+        self.phase('follows', self.create_follows, users, weights)
+
+    def phase(self, name, func, *args):
+        started = time.monotonic()
+        with transaction.atomic():
+            result, count = func(*args)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{name}: {count} строк за {elapsed:.1f} с '
+            f'({count / elapsed * 60:,.0f} строк/мин)'
+        )
+        return result
+
+    def bulk_create(self, model, objects, **kwargs):
+        count = 0
+        for chunk in chunks(objects, self.batch_size):
+            model.objects.bulk_create(chunk, **kwargs)
+            count += len(chunk)
+        return count
+
+    def text(self, min_sentences, max_sentences):
+        size = self.rng.randint(min_sentences, max_sentences)
+        return ' '.join(self.rng.sample(self.sentences, size))
+
+    def create_users(self):
+        prefix = self.options['prefix']
+        password = make_password(None)
+        count = self.bulk_create(User, (
+            User(
+                username=f'{prefix}{number}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+            )
+            for number in range(self.options['users'])
+        ))
+        ids = list(
+            User.objects.filter(username__startswith=prefix)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        return ids, count
+
+    def create_groups(self):
+        prefix = self.options['prefix']
+        count = self.bulk_create(Group, (
+            Group(
+                title=self.faker.catch_phrase(),
+                slug=f'{prefix}-{number}',
+                description=self.text(1, 3),
+            )
+            for number in range(self.options['groups'])
+        ))
+        ids = list(
+            Group.objects.filter(slug__startswith=f'{prefix}-')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        return ids, count
+
+    def random_date(self, since):
+        return since + (self.now - since) * self.rng.random()
+
+    def create_posts(self, users, weights, groups):
+        total = self.options['posts']
+        authors = self.rng.choices(users, weights, k=total)
+        # Популярность групп убывает по закону Ципфа.
+        group_weights = list(accumulate(
+            1 / rank for rank in range(1, len(groups) + 1)
+        ))
+        start = self.now - timedelta(days=self.options['days'])
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+
+        def group_id():
+            if not groups or self.rng.random() < 0.3:
+                return None
+            return self.rng.choices(groups, cum_weights=group_weights)[0]
+
+        def post(author):
+            pub_date = self.random_date(start)
+            # Иначе archive_posts сочтёт все посты недавно изменёнными.
+            return Post(
+                text=self.text(1, 6),
+                author_id=author,
+                group_id=group_id(),
+                pub_date=pub_date,
+                updated=pub_date,
+            )
+
+        count = self.bulk_create(Post, (post(author) for author in authors))
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', 'author_id', 'pub_date')
+        )
+        return posts, count
+
+    def create_comments(self, users, weights, posts):
+        if not posts:
+            return None, 0
+        total = self.options['comments']
+        # Посты популярных авторов собирают больше комментариев.
+        popularity = dict(zip(users, weights))
+        targets = self.rng.choices(
+            posts,
+            [popularity[author] for _, author, _ in posts],
+            k=total
+        )
+        count = self.bulk_create(Comment, (
+            Comment(
+                post_id=post_id,
+                author_id=self.rng.choice(users),
+                text=self.text(1, 2),
+                created=self.random_date(pub_date),
+            )
+            for post_id, _, pub_date in targets
+        ))
+        return None, count
+
+    def fill_comment_paths(self, posts):
+        if not posts:
+            return None, 0
+        return None, fill_root_paths(
+            Comment.objects.filter(post_id__gte=posts[0][0]),
+            self.batch_size
+        )
+
+    def count_comments(self, posts):
+        # bulk_create не шлёт сигналов — счётчики считаем разом.
+        if not posts:
+            return None, 0
+        fixed = sum(reconcile(
+            Post, Comment, self.batch_size,
+            Post.objects.filter(pk__gte=posts[0][0])
+        ))
+        return None, fixed
+
+    def create_follows(self, users, weights):
+        total = min(self.options['follows'], len(users) * (len(users) - 1))
+        cum_weights = list(accumulate(weights))
+        pairs = set()
+        for _ in range(10):
+            missing = total - len(pairs)
+            if not missing:
+                break
+            authors = self.rng.choices(users, cum_weights=cum_weights,
+                                       k=missing)
+            for author in authors:
+                user = self.rng.choice(users)
+                if user != author:
+                    pairs.add((user, author))
+        count = self.bulk_create(
+            Follow,
+            (Follow(user_id=user, author_id=author)
+             for user, author in sorted(pairs)),
+            ignore_conflicts=True,
+        )
+        return None, count
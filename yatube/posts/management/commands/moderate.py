@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from posts.moderation import (
+    ACTIONS, TARGETS, create_job, job_batches, matching, unfinished_jobs,
+)
+
+
+def moment(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Не понимаю дату: {value}')
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Скрывает, показывает или удаляет посты или комментарии по автору, '
+        'периоду и тексту пачками в коротких транзакциях. С --resume '
+        'продолжает прерванные задания.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', nargs='?', choices=sorted(TARGETS))
+        parser.add_argument('action', nargs='?', choices=ACTIONS)
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument(
+            '--since', type=moment, help='Не раньше даты (ГГГГ-ММ-ДД).'
+        )
+        parser.add_argument(
+            '--until', type=moment, help='Раньше даты (ГГГГ-ММ-ДД).'
+        )
+        parser.add_argument(
+            '--pattern',
+            help='Подстрока текста; в SQLite регистр не учитывается '
+                 'только для латиницы.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько записей обрабатывать в одной транзакции.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать подходящие записи.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить незавершённые задания с последнего id.'
+        )
+
+    def run(self, job, name):
+        for _ in job_batches(job):
+            self.stdout.write(f'{name}: обработано {job.done}')
+        self.stdout.write(f'{name}: готово, всего {job.done}')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            for job in unfinished_jobs():
+                self.run(job, f'{job.model} {job.action}')
+            return
+        if not (options['target'] and options['action']):
+            raise CommandError('Нужны цель и действие или --resume.')
+        filters = {
+            name: options[name]
+            for name in ('author', 'since', 'until', 'pattern')
+        }
+        if not any(filters.values()):
+            raise CommandError(
+                'Нужен хотя бы один фильтр: --author, --since, --until '
+                'или --pattern.'
+            )
+        for model in TARGETS[options['target']]:
+            queryset = matching(model, **filters)
+            name = model._meta.verbose_name_plural
+            if options['dry_run']:
+                self.stdout.write(f'{name}: подходит {queryset.count()}')
+                continue
+            job = create_job(
+                queryset, options['action'], options['batch_size']
+            )
+            self.run(job, name)
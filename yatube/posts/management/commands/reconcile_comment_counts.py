@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает Post.comment_count там, где он разошёлся с '
+        'настоящим числом комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов проверять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        pairs = ((Post, Comment), (ArchivedPost, ArchivedComment))
+        for model, comment_model in pairs:
+            fixed = sum(reconcile(
+                model, comment_model, options['batch_size']
+            ))
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: исправлено {fixed}'
+            )
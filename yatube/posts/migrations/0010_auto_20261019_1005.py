@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counts(apps, schema_editor):
+    for post_name, comment_name in (
+        ('Post', 'Comment'), ('ArchivedPost', 'ArchivedComment')
+    ):
+        post_model = apps.get_model('posts', post_name)
+        comment_model = apps.get_model('posts', comment_name)
+        counts = comment_model.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(total=Count('pk'))
+        post_model.objects.update(comment_count=Coalesce(
+            Subquery(counts.values('total'), output_field=IntegerField()), 0
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_auto_20261019_0940'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Комментариев'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:30
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.http import int_to_base36
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+BATCH_SIZE = 1000
+
+
+def segment(comment):
+    delta = comment.created - EPOCH
+    microseconds = (
+        (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+    )
+    return (
+        int_to_base36(microseconds).rjust(11, '0')
+        + int_to_base36(comment.pk).rjust(7, '0')
+    )
+
+
+def fill_paths(apps, schema_editor):
+    # Все существующие комментарии — корни своих веток. Таблица
+    # обходится пачками по pk, а не читается в память целиком.
+    for name in ('Comment', 'ArchivedComment'):
+        model = apps.get_model('posts', name)
+        queryset = model.objects.only('pk', 'created').order_by('pk')
+        last_pk = 0
+        while True:
+            comments = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not comments:
+                break
+            for comment in comments:
+                comment.path = segment(comment)
+            model.objects.bulk_update(comments, ['path'])
+            last_pk = comments[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_auto_20261019_1005'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='archivedcomment',
+            name='archcomment_post_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_post_created_idx',
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.ArchivedComment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['post', 'path'], name='archcomment_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='archcomment_root_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='comment_root_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_auto_20261019_1030'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт'),
+        ),
+    ]
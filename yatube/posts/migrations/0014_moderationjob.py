@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_auto_20261019_1130'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('action', models.CharField(max_length=10, verbose_name='Действие')),
+                ('query', models.BinaryField()),
+                ('batch_size', models.PositiveIntegerField(blank=True, null=True)),
+                ('last_pk', models.IntegerField(blank=True, null=True, verbose_name='Последний id')),
+                ('done', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('finished', models.BooleanField(default=False, verbose_name='Завершено')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+        ),
+    ]
@@ -42,6 +42,14 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    updated = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения'
+    )
+    # Денормализованный счётчик, см. posts.counters.
+    comment_count = models.PositiveIntegerField(
+        default=0, verbose_name='Комментариев'
+    )
+    is_hidden = models.BooleanField(default=False, verbose_name='Скрыт')
 
     class Meta:
         ordering = ['-pub_date']
@@ -70,6 +78,26 @@ class Comment(models.Model):
     created = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='replies',
+        blank=True,
+        null=True,
+        verbose_name='Ответ на'
+    )
+    # Материализованный путь ветки, см. posts.comments.
+    path = models.CharField(max_length=255, blank=True, default='')
+    depth = models.PositiveSmallIntegerField(default=0)
+    is_hidden = models.BooleanField(default=False, verbose_name='Скрыт')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path'], name='comment_path_idx'),
+            models.Index(
+                fields=['post', 'depth', 'path'], name='comment_root_idx'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -88,3 +116,125 @@ class Follow(models.Model):
         constraints = [
             UniqueConstraint(fields=['user', 'author'], name='unique_follow')
         ]
+
+
+class Suggestion(models.Model):
+    """Предложение подписаться (см. posts.recommendations)."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='suggestions'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'rank'], name='unique_suggestion_rank'
+            )
+        ]
+
+
+class ArchivedPost(models.Model):
+    """Холодная копия старого поста (см. posts.archive)."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(
+        db_index=True, verbose_name='Дата публикации'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор поста'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        blank=True,
+        null=True,
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    updated = models.DateTimeField(verbose_name='Дата изменения')
+    comment_count = models.PositiveIntegerField(
+        default=0, verbose_name='Комментариев'
+    )
+    is_hidden = models.BooleanField(default=False, verbose_name='Скрыт')
+    archived = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата архивации'
+    )
+
+    class Meta:
+        ordering = ['-pub_date']
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор поста'
+    )
+    text = models.TextField(verbose_name='Текст поста')
+    created = models.DateTimeField(verbose_name='Дата публикации')
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='replies',
+        blank=True,
+        null=True,
+        verbose_name='Ответ на'
+    )
+    path = models.CharField(max_length=255, blank=True, default='')
+    depth = models.PositiveSmallIntegerField(default=0)
+    is_hidden = models.BooleanField(default=False, verbose_name='Скрыт')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'path'], name='archcomment_path_idx'
+            ),
+            models.Index(
+                fields=['post', 'depth', 'path'], name='archcomment_root_idx'
+            ),
+        ]
+
+
+class ModerationJob(models.Model):
+    """Состояние задания массовой модерации (см. posts.moderation)."""
+    model = models.CharField(max_length=100, verbose_name='Модель')
+    action = models.CharField(max_length=10, verbose_name='Действие')
+    # pickle от ``queryset.query``: по нему задание продолжается.
+    query = models.BinaryField()
+    batch_size = models.PositiveIntegerField(null=True, blank=True)
+    last_pk = models.IntegerField(
+        null=True, blank=True, verbose_name='Последний id'
+    )
+    done = models.PositiveIntegerField(default=0, verbose_name='Обработано')
+    finished = models.BooleanField(default=False, verbose_name='Завершено')
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    updated = models.DateTimeField(auto_now=True, verbose_name='Обновлено')
+
+    def __str__(self):
+        return f'{self.model} {self.action}'
@@ -0,0 +1,177 @@
+"""Массовая модерация постов и комментариев.
+
+Спам удаляется или скрывается пачками по ``pk``: каждая пачка —
+отдельная короткая транзакция с ``UPDATE``/``DELETE`` по списку id,
+поэтому блокировка записи SQLite не держится дольше одной пачки.
+Из админки задание уходит в фоновый поток, прогресс пишется в логгер
+``yatube.moderation`` и в ``ModerationJob`` — в той же транзакции, что
+и пачка. Задание, прерванное перезапуском процесса, продолжается с
+последнего id командой ``moderate --resume``; команда ``moderate`` с
+фильтрами выполняет новое задание сразу.
+
+Посты удаляются после своих комментариев: иначе сборщик каскадного
+удаления загружает в память все комментарии пачки постов.
+"""
+import logging
+import pickle
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+from core.writes import run_write
+
+from . import counters, timelines
+from .archive import archive_changed
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, ModerationJob, Post,
+)
+
+logger = logging.getLogger('yatube.moderation')
+
+TARGETS = {
+    'posts': (Post, ArchivedPost),
+    'comments': (Comment, ArchivedComment),
+}
+
+ACTIONS = ('hide', 'unhide', 'delete')
+
+# Модель комментариев для каждой модели постов.
+COMMENTS = dict(zip(TARGETS['posts'], TARGETS['comments']))
+
+
+def date_field(model):
+    return 'pub_date' if model in TARGETS['posts'] else 'created'
+
+
+def matching(model, author=None, since=None, until=None, pattern=None):
+    """Записи ``model`` автора ``author`` за период с текстом ``pattern``."""
+    queryset = model.objects.all()
+    if author:
+        queryset = queryset.filter(author__username=author)
+    field = date_field(model)
+    if since:
+        queryset = queryset.filter(**{f'{field}__gte': since})
+    if until:
+        queryset = queryset.filter(**{f'{field}__lt': until})
+    if pattern:
+        queryset = queryset.filter(text__icontains=pattern)
+    return queryset
+
+
+def _apply(model, action, ids):
+    queryset = model.objects.filter(pk__in=ids)
+    if action != 'delete':
+        if model is Post:
+            # update() не шлёт сигналов, а скрытые посты уходят из лент.
+            authors = set(queryset.values_list('author_id', flat=True))
+            for author_id in authors:
+                timelines.changed(author_id)
+        elif model is ArchivedPost:
+            archive_changed()
+        return queryset.update(is_hidden=action == 'hide')
+    if model not in TARGETS['comments']:
+        with counters.paused():
+            COMMENTS[model].objects.filter(post_id__in=ids).delete()
+            return queryset.delete()[1].get(model._meta.label, 0)
+    post_ids = set(queryset.values_list('post_id', flat=True))
+    # Ответы удаляются каскадом, поэтому счётчики проще пересчитать.
+    with counters.paused():
+        deleted = queryset.delete()[1].get(model._meta.label, 0)
+    post_model = model._meta.get_field('post').related_model
+    counters.fix_counts(post_model, model, post_ids)
+    return deleted
+
+
+def _apply_batch(model, action, ids, job):
+    count = _apply(model, action, ids)
+    if job is not None:
+        job.last_pk = ids[-1]
+        job.done += count
+        job.save(update_fields=['last_pk', 'done', 'updated'])
+    return count
+
+
+def run_batches(queryset, action, batch_size=None, job=None):
+    """Применяет ``action`` к ``queryset`` пачками, отдавая их размер.
+
+    С ``job`` начинает после ``job.last_pk`` и сохраняет прогресс.
+    """
+    if action not in ACTIONS:
+        raise ValueError(action)
+    batch_size = batch_size or settings.MODERATION_BATCH_SIZE
+    queryset = queryset.order_by('pk')
+    last_pk = job.last_pk if job is not None else None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk
+        )
+        ids = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        last_pk = ids[-1]
+        yield run_write(_apply_batch, queryset.model, action, ids, job)
+
+
+def create_job(queryset, action, batch_size=None):
+    """Записывает задание, чтобы его можно было продолжить."""
+    if action not in ACTIONS:
+        raise ValueError(action)
+    return ModerationJob.objects.create(
+        model=queryset.model._meta.label,
+        action=action,
+        query=pickle.dumps(queryset.query),
+        batch_size=batch_size,
+    )
+
+
+def job_queryset(job):
+    queryset = apps.get_model(job.model).objects.all()
+    queryset.query = pickle.loads(job.query)
+    return queryset
+
+
+def job_batches(job):
+    """Пачки задания с места остановки; в конце отмечает его
+    завершённым."""
+    yield from run_batches(
+        job_queryset(job), job.action, job.batch_size, job
+    )
+    job.finished = True
+    job.save(update_fields=['finished', 'updated'])
+
+
+def unfinished_jobs():
+    return ModerationJob.objects.filter(finished=False).order_by('pk')
+
+
+def run_job(job):
+    """Выполняет задание до конца с записью прогресса в лог."""
+    label = f'{job.model} {job.action}'
+    for _ in job_batches(job):
+        logger.info('%s: обработано %s', label, job.done)
+    logger.info('%s: готово, всего %s', label, job.done)
+    return job.done
+
+
+def _background(job):
+    try:
+        run_job(job)
+    except Exception:
+        logger.exception('%s %s: ошибка', job.model, job.action)
+    finally:
+        connection.close()
+
+
+def start_job(queryset, action, batch_size=None):
+    """Запускает задание в фоне при ``MODERATION_BACKGROUND``.
+
+    Возвращает число обработанных записей или None, если задание ушло
+    в фоновый поток.
+    """
+    job = create_job(queryset, action, batch_size)
+    if not settings.MODERATION_BACKGROUND:
+        return run_job(job)
+    threading.Thread(target=_background, args=(job,), daemon=True).start()
+    return None
@@ -0,0 +1,152 @@
+"""Рекомендации «на кого подписаться», считаемые офлайн.
+
+Команда ``build_suggestions`` читает таблицу ``Follow`` в две
+разреженные матрицы смежности (CSR на ``array('l')``: подписки и
+подписчики) и для каждого пользователя складывает два сигнала:
+
+* друзья друзей — авторы, на которых подписаны его авторы;
+* совместные подписки — авторы, на которых подписаны другие
+  подписчики его авторов; вклад популярного автора делится на число
+  его подписчиков, а обходится не больше ``SUGGESTIONS_FANOUT`` из них.
+
+Лучшие ``SUGGESTIONS_TOP`` авторов сохраняются в ``Suggestion``
+с рангом, и страница читает их одним запросом по индексу
+``(user, rank)``.
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+from core.writes import run_write
+
+from . import follows
+from .models import Follow, Suggestion
+
+FRIEND_OF_FRIEND_WEIGHT = 1.0
+CO_FOLLOW_WEIGHT = 0.5
+
+
+class Adjacency:
+    """Списки соседей, отсортированные по узлу, в трёх массивах."""
+
+    def __init__(self, pairs):
+        self.nodes = array('l')
+        self.offsets = array('l')
+        self.targets = array('l')
+        for source, target in pairs:
+            if not self.nodes or self.nodes[-1] != source:
+                self.nodes.append(source)
+                self.offsets.append(len(self.targets))
+            self.targets.append(target)
+        self.offsets.append(len(self.targets))
+
+    def neighbours(self, node):
+        index = bisect_left(self.nodes, node)
+        if index == len(self.nodes) or self.nodes[index] != node:
+            return self.targets[:0]
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+
+def load_graph():
+    """Подписки и подписчики из ``Follow`` двумя проходами по таблице."""
+    following = Adjacency(
+        Follow.objects.order_by('user_id', 'author_id')
+        .values_list('user_id', 'author_id').iterator()
+    )
+    followers = Adjacency(
+        Follow.objects.order_by('author_id', 'user_id')
+        .values_list('author_id', 'user_id').iterator()
+    )
+    return following, followers
+
+
+def scores(user_id, following, followers, fanout=None):
+    """Баллы авторов, на которых ``user_id`` ещё не подписан."""
+    fanout = fanout or settings.SUGGESTIONS_FANOUT
+    followed = following.neighbours(user_id)
+    result = defaultdict(float)
+    for author in followed:
+        for candidate in following.neighbours(author):
+            result[candidate] += FRIEND_OF_FRIEND_WEIGHT
+        fans = followers.neighbours(author)
+        step = max(len(fans) // fanout, 1)
+        weight = CO_FOLLOW_WEIGHT * step / len(fans)
+        for fan in fans[::step][:fanout]:
+            if fan == user_id:
+                continue
+            for candidate in following.neighbours(fan):
+                result[candidate] += weight
+    result.pop(user_id, None)
+    for author in followed:
+        result.pop(author, None)
+    return result
+
+
+def top_suggestions(user_id, following, followers, top=None):
+    """``top`` пар ``(автор, балл)``; при равенстве — меньший id."""
+    top = top or settings.SUGGESTIONS_TOP
+    return heapq.nlargest(
+        top,
+        scores(user_id, following, followers).items(),
+        key=lambda item: (item[1], -item[0]),
+    )
+
+
+def _store(lower, upper, rows):
+    stale = Suggestion.objects.all()
+    if lower is not None:
+        stale = stale.filter(user_id__gte=lower)
+    if upper is not None:
+        stale = stale.filter(user_id__lt=upper)
+    stale.delete()
+    Suggestion.objects.bulk_create(rows)
+
+
+def build_suggestions(top=None, batch_size=1000):
+    """Пересчитывает ``Suggestion`` пачками пользователей, отдавая размер
+    каждой.
+
+    Пачка заменяет предложения всех пользователей своего диапазона id,
+    поэтому у тех, кто отписался от всех, старые предложения пропадают.
+    """
+    following, followers = load_graph()
+    users = following.nodes
+    if not users:
+        run_write(_store, None, None, [])
+        return
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        rows = [
+            Suggestion(user_id=user_id, author_id=author_id,
+                       rank=rank, score=score)
+            for user_id in batch
+            for rank, (author_id, score) in enumerate(
+                top_suggestions(user_id, following, followers, top)
+            )
+        ]
+        lower = batch[0] if start else None
+        end = start + batch_size
+        upper = users[end] if end < len(users) else None
+        run_write(_store, lower, upper, rows)
+        yield len(batch)
+
+
+def suggestions_for(user, limit=None):
+    """Авторы для блока «на кого подписаться»: одно чтение по индексу.
+
+    Подписки, сделанные после пересчёта, отсекаются по кешу
+    ``posts.follows``.
+    """
+    if not user.is_authenticated:
+        return []
+    limit = limit or settings.SUGGESTIONS_SHOWN
+    rows = Suggestion.objects.filter(user=user).select_related(
+        'author'
+    ).order_by('rank')[:settings.SUGGESTIONS_TOP]
+    return [
+        row.author for row in rows
+        if not follows.is_following(user, row.author_id)
+    ][:limit]
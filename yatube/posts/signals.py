@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, follows, timelines
+from .archive import archive_changed
+from .models import ArchivedPost, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Поля автора, которые видны в карточке поста.
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def touch_posts(**filters):
+    """Сдвигает ``updated`` постов, чтобы сменились ключи их карточек."""
+    now = timezone.now()
+    Post.objects.filter(**filters).update(updated=now)
+    ArchivedPost.objects.filter(**filters).update(updated=now)
+
+
+@receiver(post_save, sender=Group)
+def group_changed(sender, instance, created, **kwargs):
+    if not created:
+        touch_posts(group=instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_names(sender, instance, update_fields=None, **kwargs):
+    # update_last_login сохраняет только last_login — имена не меняются.
+    instance._card_names_changed = False
+    if instance.pk is None:
+        return
+    if update_fields and not set(update_fields) & set(AUTHOR_CARD_FIELDS):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        *AUTHOR_CARD_FIELDS
+    ).first()
+    new = tuple(getattr(instance, name) for name in AUTHOR_CARD_FIELDS)
+    instance._card_names_changed = old is not None and old != new
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, **kwargs):
+    if getattr(instance, '_card_names_changed', False):
+        touch_posts(author=instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not counters.is_paused():
+        counters.comment_added(Post, instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if not counters.is_paused():
+        counters.comment_removed(Post, instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    follows.changed(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    timelines.changed(instance.author_id)
+
+
+@receiver(post_save, sender=ArchivedPost)
+@receiver(post_delete, sender=ArchivedPost)
+def archived_post_changed(sender, **kwargs):
+    archive_changed()
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.follows import is_following
+
+register = template.Library()
+
+
+@register.filter
+def follows(user, author_id):
+    """``{% if user|follows:author.pk %}`` — подписка без запроса к БД."""
+    return is_following(user, author_id)
@@ -0,0 +1,49 @@
+from django import template
+
+from posts.cards import CARD_TEMPLATE, card_key
+
+register = template.Library()
+
+
+def card_nodelist(context):
+    """Скомпилированные узлы карточки, одни на весь рендер страницы."""
+    cache = context.render_context.dicts[0]
+    nodelist = cache.get(CARD_TEMPLATE)
+    if nodelist is None:
+        nodelist = cache[CARD_TEMPLATE] = context.template.engine.get_template(
+            CARD_TEMPLATE
+        ).nodelist
+    return nodelist
+
+
+class PostCardNode(template.Node):
+    def __init__(self, post):
+        self.post = post
+
+    def render(self, context):
+        post = self.post.resolve(context)
+        cards = context.get('post_cards')
+        if cards:
+            html = cards.get(card_key(post))
+            if html is not None:
+                return html
+        nodelist = card_nodelist(context)
+        with context.push(post=post):
+            return nodelist.render(context)
+
+
+@register.tag
+def post_card(parser, token):
+    """Карточка поста без {% include %} на каждой итерации цикла.
+
+    Шаблон ищется один раз за рендер страницы, а его узлы рендерятся
+    прямо в текущем контексте — без обёртки ``Template.render`` и
+    поиска имени шаблона на каждом посте. Если view положил в контекст
+    ``post_cards`` (``posts.cards.prefetch_cards``), берётся готовый HTML.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает ровно один аргумент: пост.'
+        )
+    return PostCardNode(parser.compile_filter(bits[1]))
@@ -0,0 +1,162 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import (
+    archive_cutoff, archive_posts, restore_post, tiered_posts,
+)
+from ..models import ArchivedComment, ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUserArchive')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.user) for i in range(15)
+        )
+        old = Post.objects.order_by('pk')[:5]
+        moment = timezone.now() - timedelta(days=400)
+        Post.objects.filter(pk__in=[post.pk for post in old]).update(
+            pub_date=moment, updated=moment
+        )
+        cls.old_post = Post.objects.order_by('pk').first()
+        Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый комментарий'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        cache.clear()
+
+    def archive(self):
+        return sum(archive_posts(archive_cutoff(365), batch_size=2))
+
+    def test_archive_moves_old_posts_in_batches(self):
+        self.assertEqual(self.archive(), 5)
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertEqual(ArchivedPost.objects.count(), 5)
+        self.assertEqual(ArchivedComment.objects.count(), 1)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_tiered_list_spans_both_tables(self):
+        """Срез на границе горячих и архивных постов склеивает выборки."""
+        self.archive()
+        posts = tiered_posts(author=self.user)
+        self.assertEqual(posts.count(), 15)
+        page = posts[8:12]
+        self.assertEqual(
+            [type(post) for post in page],
+            [Post, Post, ArchivedPost, ArchivedPost]
+        )
+        self.assertEqual(len(posts[10:]), 5)
+
+    def test_restored_post_keeps_its_place(self):
+        """Возвращённый из архива пост сливается с архивом по дате."""
+        self.archive()
+        restore_post(ArchivedPost.objects.get(pk=self.old_post.pk))
+        expected = sorted(
+            [(post.pub_date, post.pk) for post in Post.objects.all()]
+            + [(post.pub_date, post.pk)
+               for post in ArchivedPost.objects.all()],
+            reverse=True,
+        )
+        expected = [pk for _, pk in expected]
+        posts = tiered_posts(author=self.user)
+        self.assertEqual([post.pk for post in posts[0:]], expected)
+        for start in range(16):
+            for stop in range(start, 17):
+                with self.subTest(start=start, stop=stop):
+                    self.assertEqual(
+                        [post.pk for post in posts[start:stop]],
+                        expected[start:stop],
+                    )
+
+    def test_restored_post_is_not_archived_again(self):
+        self.archive()
+        restore_post(ArchivedPost.objects.get(pk=self.old_post.pk))
+        self.assertEqual(self.archive(), 0)
+        self.assertTrue(Post.objects.filter(pk=self.old_post.pk).exists())
+
+    def test_views_read_archive(self):
+        self.archive()
+        response = self.client.get(reverse('posts:index') + '?page=2')
+        self.assertEqual(len(response.context['page_obj']), 5)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.old_post.pk,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['comments']), 1)
+        self.assertEqual(response.context['author_post_count'], 15)
+
+    def test_comment_restores_post(self):
+        self.archive()
+        self.client.post(
+            reverse('posts:add_comment', args=(self.old_post.pk,)),
+            {'text': 'Новый комментарий'}
+        )
+        post = Post.objects.get(pk=self.old_post.pk)
+        self.assertEqual(post.pub_date, self.old_post.pub_date)
+        self.assertEqual(post.comments.count(), 2)
+        self.assertFalse(ArchivedPost.objects.filter(pk=post.pk).exists())
+
+    def test_restore_keeps_dates_of_large_thread(self):
+        created = timezone.now() - timedelta(days=401)
+        Comment.objects.bulk_create(
+            Comment(post=self.old_post, author=self.user, text=i)
+            for i in range(1500)
+        )
+        Comment.objects.update(created=created)
+        self.archive()
+        restore_post(ArchivedPost.objects.get(pk=self.old_post.pk))
+        self.assertEqual(Comment.objects.count(), 1501)
+        self.assertFalse(Comment.objects.exclude(created=created).exists())
+
+    def test_reads_and_invalid_writes_keep_post_archived(self):
+        self.archive()
+        other = Client()
+        other.force_login(User.objects.create_user(username='Other'))
+        edit_url = reverse('posts:post_edit', args=(self.old_post.pk,))
+        comment_url = reverse('posts:add_comment', args=(self.old_post.pk,))
+        other.get(edit_url)
+        other.post(edit_url, {'text': 'Чужая правка'})
+        self.client.get(edit_url)
+        self.client.get(comment_url)
+        self.client.post(comment_url, {'text': ''})
+        self.assertTrue(
+            ArchivedPost.objects.filter(pk=self.old_post.pk).exists()
+        )
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+
+    def test_author_edit_restores_post(self):
+        self.archive()
+        self.client.post(
+            reverse('posts:post_edit', args=(self.old_post.pk,)),
+            {'text': 'Правка'}
+        )
+        post = Post.objects.get(pk=self.old_post.pk)
+        self.assertEqual(post.text, 'Правка')
+        self.assertEqual(post.pub_date, self.old_post.pub_date)
+        self.assertEqual(post.comment_count, 1)
+        self.assertFalse(ArchivedPost.objects.filter(pk=post.pk).exists())
+
+    def test_command(self):
+        call_command('archive_posts', days=365, stdout=open('/dev/null', 'w'))
+        self.assertEqual(ArchivedPost.objects.count(), 5)
+
+    def test_archive_count_is_cached_until_archive_changes(self):
+        self.archive()
+        posts = tiered_posts(author=self.user)
+        self.assertEqual(posts.count(), 15)
+        with self.assertNumQueries(1):
+            self.assertEqual(tiered_posts(author=self.user).count(), 15)
+        ArchivedPost.objects.filter(pk=self.old_post.pk).get().delete()
+        self.assertEqual(tiered_posts(author=self.user).count(), 14)
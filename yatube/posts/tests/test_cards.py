@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..cards import card_key, prefetch_cards, render_card
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='card_author')
+        cls.group = Group.objects.create(title='Группа', slug='cards')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Текст карточки'
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Объекты класса общие для тестов, а база откатывается.
+        self.post.refresh_from_db()
+        self.group.refresh_from_db()
+        self.author.refresh_from_db()
+
+    def refreshed_key(self):
+        self.post.refresh_from_db()
+        return card_key(self.post)
+
+    def test_prefetch_uses_single_get_many(self):
+        """Повторная сборка берёт карточки из кеша без рендеринга."""
+        first = prefetch_cards([self.post])
+        with mock.patch.object(cache, 'get_many',
+                               wraps=cache.get_many) as get_many, \
+                mock.patch('posts.cards.render_card') as render:
+            second = prefetch_cards([self.post])
+        self.assertEqual(get_many.call_count, 1)
+        render.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(first[card_key(self.post)], render_card(self.post))
+
+    def test_feed_serves_cached_card(self):
+        cache.set(card_key(self.post), '<article>из кеша</article>')
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertContains(response, '<article>из кеша</article>')
+
+    def test_cold_feed_queries_do_not_grow_with_page(self):
+        """Авторы и группы незакешированных карточек читаются JOIN."""
+        def cold_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('posts:index'))
+            return len(queries)
+
+        single = cold_queries()
+        for i in range(3):
+            Post.objects.create(
+                author=User.objects.create_user(username=f'card{i}'),
+                group=Group.objects.create(title=i, slug=f'cards{i}'),
+                text='Ещё карточка',
+            )
+        self.assertEqual(cold_queries(), single)
+
+    def test_edit_changes_key(self):
+        key = card_key(self.post)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertNotEqual(self.refreshed_key(), key)
+
+    def test_group_change_changes_key(self):
+        key = card_key(self.post)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertNotEqual(self.refreshed_key(), key)
+
+    def test_author_name_change_changes_key(self):
+        key = card_key(self.post)
+        self.author.first_name = 'Анна'
+        self.author.save()
+        self.assertNotEqual(self.refreshed_key(), key)
+
+    def test_login_keeps_key(self):
+        """Вход пользователя обновляет только last_login."""
+        key = card_key(self.post)
+        self.client.force_login(self.author)
+        self.author.save(update_fields=['last_login'])
+        self.assertEqual(self.refreshed_key(), key)
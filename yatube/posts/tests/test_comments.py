@@ -0,0 +1,154 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..comments import comment_page, fill_root_paths, save_comment, subtree
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PER_PAGE=4)
+class CommentPageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='commenter')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(10)
+        )
+        # Одинаковое время у части комментариев: порядок решает id.
+        Comment.objects.filter(text__in=[
+            'Комментарий 3', 'Комментарий 4', 'Комментарий 5'
+        ]).update(created=timezone.now())
+        fill_root_paths(Comment.objects.all())
+
+    def all_pages(self):
+        pages, cursor = [], None
+        while True:
+            comments, cursor = comment_page(self.post, cursor)
+            pages.append(comments)
+            if cursor is None:
+                return pages
+
+    def test_fill_root_paths_in_batches(self):
+        Comment.objects.update(path='', depth=3)
+        self.assertEqual(
+            fill_root_paths(Comment.objects.all(), batch_size=3), 10
+        )
+        self.assertFalse(Comment.objects.filter(path='').exists())
+        self.assertFalse(Comment.objects.exclude(depth=0).exists())
+
+    def test_pages_cover_every_comment_once(self):
+        pages = self.all_pages()
+        self.assertEqual([len(page) for page in pages], [4, 4, 2])
+        comments = [comment for page in pages for comment in page]
+        self.assertEqual(
+            [comment.pk for comment in comments],
+            list(Comment.objects.order_by('created', 'pk')
+                 .values_list('pk', flat=True))
+        )
+
+    def reply(self, parent, text):
+        comment = Comment(post=self.post, author=self.user, text=text)
+        return save_comment(comment, parent)
+
+    def test_replies_follow_their_root(self):
+        """Ответы идут сразу за своим корнем, в глубину и по времени."""
+        first, second = comment_page(self.post)[0][:2]
+        answer = self.reply(first, 'Ответ')
+        nested = self.reply(answer, 'Ответ на ответ')
+        late = self.reply(first, 'Поздний ответ')
+        page, _ = comment_page(self.post, limit=5)
+        self.assertEqual(
+            page[:5], [first, answer, nested, late, second]
+        )
+        self.assertEqual(
+            [comment.depth for comment in page[:5]], [0, 1, 2, 1, 0]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(list(subtree(answer)), [answer, nested])
+
+    def test_large_thread_is_split_between_pages(self):
+        """Ответы считаются в размер страницы наравне с корнями."""
+        first = comment_page(self.post)[0][0]
+        parent = first
+        for number in range(6):
+            parent = self.reply(
+                first if number % 2 else parent, f'Ответ {number}'
+            )
+        pages = self.all_pages()
+        self.assertTrue(all(len(page) <= 4 for page in pages))
+        self.assertEqual(
+            [comment.pk for page in pages for comment in page],
+            list(Comment.objects.order_by('path')
+                 .values_list('pk', flat=True))
+        )
+
+    def test_hidden_branch_stays_hidden_on_next_page(self):
+        first = comment_page(self.post)[0][0]
+        replies = [self.reply(first, f'Ответ {number}') for number in range(5)]
+        Comment.objects.filter(pk=first.pk).update(is_hidden=True)
+        shown = [comment for page in self.all_pages() for comment in page]
+        self.assertEqual(len(shown), 9)
+        self.assertFalse(set(shown) & {first, *replies})
+
+    @override_settings(COMMENT_MAX_DEPTH=2)
+    def test_depth_limit(self):
+        """Ответ на самый глубокий комментарий становится его соседом."""
+        parent = comment_page(self.post)[0][0]
+        for number in range(4):
+            parent = self.reply(parent, f'Уровень {number}')
+        self.assertEqual(parent.depth, 2)
+        self.assertEqual(
+            Comment.objects.filter(post=self.post, depth__gt=2).count(), 0
+        )
+
+    def test_reply_through_view(self):
+        root = comment_page(self.post)[0][0]
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Ответ из формы', 'parent': root.pk}
+        )
+        reply = Comment.objects.get(text='Ответ из формы')
+        self.assertEqual(reply.parent, root)
+        self.assertTrue(reply.path.startswith(root.path))
+
+    def test_post_detail_shows_first_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertEqual(len(response.context['comments']), 4)
+        self.assertContains(response, 'data-load-more')
+
+    def test_load_more_fragment(self):
+        first, cursor = comment_page(self.post)
+        response = self.client.get(
+            reverse('posts:post_comments', args=[self.post.pk]),
+            {'after': cursor}
+        )
+        self.assertNotContains(response, '<html')
+        self.assertNotContains(response, first[-1].text + '\n')
+        self.assertEqual(len(response.context['comments']), 4)
+        self.assertContains(response, 'Показать ещё')
+
+    def test_bad_cursor(self):
+        response = self.client.get(
+            reverse('posts:post_comments', args=[self.post.pk]),
+            {'after': 'garbage'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            'bench_comment_threads', depth=3, fanout=2, rounds=1, stdout=out
+        )
+        self.assertIn('1 запросов  15 комментариев', out.getvalue())
+        self.assertFalse(Comment.objects.filter(depth__gt=0).exists())
@@ -0,0 +1,69 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..archive import archive_cutoff, archive_posts
+from ..models import ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class CommentCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='counter')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def count(self):
+        return Post.objects.get(pk=self.post.pk).comment_count
+
+    def test_add_comment_increments(self):
+        self.client.force_login(self.user)
+        for _ in range(2):
+            self.client.post(
+                reverse('posts:add_comment', args=[self.post.pk]),
+                {'text': 'Комментарий'}
+            )
+        self.assertEqual(self.count(), 2)
+
+    def test_delete_decrements(self):
+        comments = [
+            Comment.objects.create(post=self.post, author=self.user, text=i)
+            for i in 'abc'
+        ]
+        comments[0].delete()
+        self.assertEqual(self.count(), 2)
+        Comment.objects.all().delete()
+        self.assertEqual(self.count(), 0)
+
+    def test_reconcile_fixes_drift(self):
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, text=str(i))
+            for i in range(3)
+        )
+        other = Post.objects.create(
+            author=self.user, text='Другой', comment_count=5
+        )
+        self.assertEqual(self.count(), 0)
+        out = StringIO()
+        call_command('reconcile_comment_counts', batch_size=1, stdout=out)
+        self.assertEqual(self.count(), 3)
+        other.refresh_from_db()
+        self.assertEqual(other.comment_count, 0)
+        self.assertIn('исправлено 2', out.getvalue())
+
+    def test_archive_keeps_count(self):
+        Comment.objects.create(post=self.post, author=self.user, text='a')
+        list(archive_posts(archive_cutoff(-1)))
+        archived = ArchivedPost.objects.get(pk=self.post.pk)
+        self.assertEqual(archived.comment_count, 1)
+
+    def test_feed_shows_count(self):
+        for number in range(5):
+            post = Post.objects.create(author=self.user, text=str(number))
+            Comment.objects.create(post=post, author=self.user, text='a')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Комментариев: 1', count=5)
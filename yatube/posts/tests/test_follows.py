@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import follows
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        for author in cls.authors[:2]:
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_followed_ids_are_cached(self):
+        expected = sorted(author.pk for author in self.authors[:2])
+        with self.assertNumQueries(1):
+            self.assertEqual(list(follows.followed_ids(self.user)), expected)
+        with self.assertNumQueries(0):
+            self.assertTrue(follows.is_following(self.user, expected[0]))
+            self.assertFalse(
+                follows.is_following(self.user, self.authors[2].pk)
+            )
+
+    def test_follow_and_unfollow_update_cache(self):
+        follows.followed_ids(self.user)
+        author = self.authors[2]
+        self.client.get(reverse('posts:profile_follow', args=[author]))
+        self.assertTrue(follows.is_following(self.user, author.pk))
+        self.client.get(reverse('posts:profile_unfollow', args=[author]))
+        self.assertFalse(follows.is_following(self.user, author.pk))
+        response = self.client.get(
+            reverse('posts:profile_unfollow', args=[author])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_cannot_follow_self(self):
+        self.assertFalse(follows.follow(self.user, self.user))
+        self.assertFalse(follows.is_following(self.user, self.user.pk))
+
+    def test_feed_uses_cached_authors(self):
+        post = Post.objects.create(author=self.authors[0], text='Пост')
+        Post.objects.create(author=self.authors[2], text='Чужой')
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [post])
+
+    def test_anonymous_follows_nobody(self):
+        self.client.logout()
+        response = self.client.get(
+            reverse('fragment', args=['follow_button']),
+            {'username': 'author0', 'author_id': self.authors[0].pk},
+        )
+        self.assertContains(response, 'Подписаться')
+
+
+class FollowBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(4)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+        cls.url = reverse('posts:follow_batch')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_batch_returns_new_state(self):
+        # Сессия и пользователь, имена, точка сохранения, вставка,
+        # удаление, точка сохранения, новое состояние.
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, {
+                'follow': [
+                    'author0', 'author1', 'author2', 'reader', 'nobody'
+                ],
+                'unfollow': ['author0'],
+            })
+        self.assertEqual(response.json(), {
+            'following': ['author1', 'author2'],
+            'unknown': ['nobody'],
+        })
+        self.assertEqual(
+            sorted(Follow.objects.filter(user=self.user).values_list(
+                'author__username', flat=True
+            )),
+            ['author1', 'author2'],
+        )
+        self.assertTrue(follows.is_following(self.user, self.authors[1].pk))
+
+    def test_batch_unfollow_skips_per_row_signals(self):
+        for author in self.authors[1:]:
+            Follow.objects.create(user=self.user, author=author)
+        names = [author.username for author in self.authors]
+        with mock.patch('posts.follows.changed') as changed:
+            response = self.client.post(self.url, {'unfollow': names})
+        # Без сброса и перечитывания кеша на каждую удалённую строку.
+        changed.assert_not_called()
+        self.assertEqual(response.json()['following'], [])
+        self.assertFalse(follows.is_following(self.user, self.authors[0].pk))
+
+    def test_get_is_not_allowed(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_too_many_names(self):
+        with self.settings(FOLLOW_BATCH_MAX=2):
+            response = self.client.post(
+                self.url, {'follow': ['author1', 'author2', 'author3']}
+            )
+        self.assertEqual(response.status_code, 400)
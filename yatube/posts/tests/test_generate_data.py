@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class GenerateDataTest(TestCase):
+    def generate(self, **options):
+        call_command(
+            'generate_data', users=30, groups=3, posts=200, comments=100,
+            follows=50, stdout=StringIO(), **options
+        )
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('pk').values_list(
+                'text', 'author__username', 'group__slug')),
+            list(Follow.objects.order_by('pk').values_list(
+                'user__username', 'author__username')),
+        )
+
+    def test_counts(self):
+        self.generate(seed=1)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertEqual(Follow.objects.count(), 50)
+
+    def test_reproducible_from_seed(self):
+        """Один и тот же seed даёт одинаковый набор данных."""
+        self.generate(seed=7)
+        first = self.snapshot()
+        for model in (Follow, Comment, Post, Group, User):
+            model.objects.all().delete()
+        self.generate(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_dates_are_spread(self):
+        self.generate(seed=1, days=100)
+        dates = Post.objects.values_list('pub_date', flat=True)
+        self.assertGreater(
+            (max(dates) - min(dates)).days, 50
+        )
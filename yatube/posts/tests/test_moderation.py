@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..comments import comment_page, save_comment
+from ..models import Comment, ModerationJob, Post
+from ..moderation import create_job, job_batches, matching, run_batches
+
+User = get_user_model()
+
+
+@override_settings(MODERATION_BACKGROUND=False)
+class ModerationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.user = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        for i in range(5):
+            Post.objects.create(author=cls.spammer, text=f'Купи {i}')
+
+    def comment(self, text, author=None, parent=None):
+        comment = Comment(post=self.post, author=author or self.user,
+                          text=text)
+        return save_comment(comment, parent)
+
+    def test_batches_hide_matching_posts(self):
+        queryset = matching(Post, author='spammer', pattern='Купи')
+        sizes = list(run_batches(queryset, 'hide', batch_size=2))
+        self.assertEqual(sizes, [2, 2, 1])
+        self.assertEqual(Post.objects.filter(is_hidden=True).count(), 5)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+
+    def test_hidden_post_is_not_found(self):
+        spam = Post.objects.filter(author=self.spammer).first()
+        list(run_batches(Post.objects.filter(pk=spam.pk), 'hide'))
+        response = self.client.get(
+            reverse('posts:post_detail', args=[spam.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_hidden_comment_hides_its_replies(self):
+        root = self.comment('Спам', author=self.spammer)
+        self.comment('Ответ', parent=root)
+        kept = self.comment('Нормальный')
+        list(run_batches(matching(Comment, author='spammer'), 'hide'))
+        comments, _ = comment_page(self.post)
+        self.assertEqual(comments, [kept])
+
+    def test_delete_comments_recounts_posts(self):
+        root = self.comment('Спам', author=self.spammer)
+        self.comment('Ответ', parent=root)
+        self.comment('Нормальный')
+        list(run_batches(matching(Comment, pattern='Спам'), 'delete'))
+        self.assertEqual(Comment.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_delete_posts_with_comments(self):
+        spam = Post.objects.filter(author=self.spammer).first()
+        for number in range(3):
+            Comment.objects.create(
+                post=spam, author=self.user, text=f'Ответ {number}'
+            )
+        self.comment('Нормальный')
+        sizes = list(run_batches(matching(Post, author='spammer'), 'delete'))
+        self.assertEqual(sizes, [5])
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_interrupted_job_resumes(self):
+        job = create_job(matching(Post, author='spammer'), 'delete', 2)
+        batches = job_batches(job)
+        next(batches)
+        batches.close()
+        job = ModerationJob.objects.get()
+        self.assertEqual((job.done, job.finished), (2, False))
+        out = StringIO()
+        call_command('moderate', resume=True, stdout=out)
+        self.assertIn('posts.Post delete: готово, всего 5', out.getvalue())
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertTrue(ModerationJob.objects.get().finished)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('moderate', 'posts', 'delete', author='spammer',
+                     batch_size=2, stdout=out)
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertIn('готово, всего 5', out.getvalue())
+
+    def test_command_dry_run(self):
+        out = StringIO()
+        call_command('moderate', 'posts', 'hide', pattern='Купи',
+                     dry_run=True, stdout=out)
+        self.assertIn('подходит 5', out.getvalue())
+        self.assertFalse(Post.objects.filter(is_hidden=True).exists())
+
+    def test_admin_action(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        spam = Post.objects.filter(author=self.spammer)
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'action': 'hide_selected',
+                '_selected_action': [post.pk for post in spam],
+            },
+            follow=True,
+        )
+        self.assertContains(response, 'Обработано записей: 5.')
+        self.assertEqual(spam.filter(is_hidden=True).count(), 5)
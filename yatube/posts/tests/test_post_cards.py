@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.template import Context, TemplateSyntaxError, engines
+from django.test import TestCase
+
+from posts.management.commands.bench_post_cards import INCLUDE_LOOP, TAG_LOOP
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardTagTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='card_author', first_name='Анна', last_name='Иванова'
+        )
+        group = Group.objects.create(title='Группа', slug='cards')
+        for number in range(3):
+            Post.objects.create(
+                author=author, group=group, text=f'Пост <{number}>'
+            )
+
+    def render(self, source):
+        engine = engines['django'].engine
+        posts = Post.objects.select_related('author')
+        return engine.from_string(source).render(Context({'posts': posts}))
+
+    def test_same_html_as_include(self):
+        """{% post_card %} даёт тот же HTML, что и {% include %}."""
+        html = self.render(TAG_LOOP)
+        self.assertEqual(html, self.render(INCLUDE_LOOP))
+        self.assertIn('Пост &lt;0&gt;', html)
+
+    def test_requires_post_argument(self):
+        with self.assertRaises(TemplateSyntaxError):
+            self.render('{% load post_cards %}{% post_card %}')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            'bench_post_cards', posts=2, repeat=1, rounds=1, stdout=out
+        )
+        self.assertIn('post_card', out.getvalue())
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Follow, Suggestion
+from ..recommendations import (Adjacency, build_suggestions, load_graph,
+                               suggestions_for, top_suggestions)
+
+User = get_user_model()
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        names = ('ann', 'bob', 'cat', 'dan', 'eve')
+        cls.users = {
+            name: User.objects.create_user(username=name) for name in names
+        }
+        for user, author in (
+            ('ann', 'bob'), ('bob', 'cat'), ('bob', 'dan'),
+            ('eve', 'bob'), ('eve', 'dan'),
+        ):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_adjacency(self):
+        graph = Adjacency([(1, 2), (1, 3), (4, 1)])
+        self.assertEqual(list(graph.neighbours(1)), [2, 3])
+        self.assertEqual(list(graph.neighbours(4)), [1])
+        self.assertEqual(list(graph.neighbours(2)), [])
+
+    def test_friend_of_friend_ranks_above_co_follow(self):
+        ann, cat, dan = (self.users[name].pk for name in ('ann', 'cat', 'dan'))
+        suggestions = top_suggestions(ann, *load_graph())
+        # dan: друг друга и совместная подписка с eve; cat: только друг.
+        self.assertEqual([author for author, _ in suggestions], [dan, cat])
+
+    def test_build_replaces_stale_suggestions(self):
+        ann = self.users['ann']
+        Suggestion.objects.create(
+            user=self.users['cat'], author=ann, rank=0, score=1
+        )
+        self.assertEqual(sum(build_suggestions(batch_size=2)), 3)
+        self.assertFalse(Suggestion.objects.filter(user=self.users['cat']))
+        self.assertEqual(
+            list(Suggestion.objects.filter(user=ann).order_by('rank')
+                 .values_list('author__username', flat=True)),
+            ['dan', 'cat'],
+        )
+
+    def test_suggestions_skip_new_follows(self):
+        ann = self.users['ann']
+        call_command('build_suggestions', stdout=StringIO())
+        Follow.objects.create(user=ann, author=self.users['dan'])
+        self.assertEqual(suggestions_for(ann), [self.users['cat']])
+
+    def test_block_on_follow_index(self):
+        call_command('build_suggestions', stdout=StringIO())
+        self.client.force_login(self.users['ann'])
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'На кого подписаться')
+        self.assertContains(response, reverse('posts:profile', args=['dan']))
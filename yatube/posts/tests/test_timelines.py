@@ -0,0 +1,146 @@
+import sqlite3
+from array import array
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts, restore_post
+from ..models import ArchivedPost, Follow, Post
+from ..moderation import run_batches
+from ..timelines import merge, timeline_key
+
+User = get_user_model()
+
+
+def timeline(*pairs, complete=True):
+    return complete, array('q', [value for pair in pairs for value in pair])
+
+
+@override_settings(PER_PAGE=3, MODERATION_BACKGROUND=False)
+class MergedTimelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        now = timezone.now()
+        for i in range(12):
+            post = Post.objects.create(author=cls.authors[i % 3], text=i)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=i)
+            )
+        for author in cls.authors[:2]:
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def page(self, number=1):
+        response = self.client.get(
+            reverse('posts:follow_index'), {'page': number}
+        )
+        return [post.pk for post in response.context['page_obj']]
+
+    def expected(self, number=1):
+        posts = Post.objects.filter(
+            author__in=self.authors[:2], is_hidden=False
+        ).order_by('-pub_date', '-pk').values_list('pk', flat=True)
+        return list(posts[(number - 1) * 3:number * 3])
+
+    def test_merge(self):
+        timelines = [timeline((30, 3), (10, 1)), timeline((20, 2))]
+        self.assertEqual(merge(timelines, 2), [3, 2])
+        self.assertEqual(merge(timelines, 5), [3, 2, 1])
+        truncated = [timeline((30, 3), complete=False), timeline((20, 2))]
+        self.assertEqual(merge(truncated, 1), [3])
+        self.assertIsNone(merge(truncated, 2))
+
+    def test_pages_match_sql(self):
+        for number in (1, 2, 3):
+            self.assertEqual(self.page(number), self.expected(number))
+
+    def test_cached_page_skips_feed_query(self):
+        expected = self.page()
+        # Сессия, пользователь, возвращённые из архива посты, посты
+        # страницы по id и блок «на кого подписаться»; число архивных
+        # постов уже в кеше.
+        with self.assertNumQueries(5):
+            self.assertEqual(self.page(), expected)
+        self.assertEqual(expected, self.expected())
+
+    def test_new_post_resets_author_timeline(self):
+        self.page()
+        post = Post.objects.create(author=self.authors[1], text='Новый')
+        self.assertEqual(self.page()[0], post.pk)
+
+    def test_hidden_post_leaves_timeline(self):
+        first = self.page()[0]
+        list(run_batches(Post.objects.filter(pk=first), 'hide'))
+        self.assertNotIn(first, self.page())
+        self.assertEqual(self.page(), self.expected())
+
+    @override_settings(AUTHOR_TIMELINE_LENGTH=2)
+    def test_truncated_timelines_fall_back_to_sql(self):
+        self.assertEqual(self.page(1), self.expected(1))
+        self.assertEqual(self.page(2), self.expected(2))
+
+    def test_restored_post_is_merged_with_archive(self):
+        cutoff = timezone.now() - timedelta(minutes=5)
+        Post.objects.update(updated=cutoff - timedelta(days=1))
+        list(archive_posts(cutoff))
+        restored = ArchivedPost.objects.filter(
+            author__in=self.authors[:2]
+        ).order_by('pub_date').first()
+        restore_post(restored)
+        pages = [self.page(number) for number in (1, 2, 3)]
+        expected = sorted(
+            list(Post.objects.filter(author__in=self.authors[:2])
+                 .values_list('pub_date', 'pk'))
+            + list(ArchivedPost.objects.filter(author__in=self.authors[:2])
+                   .values_list('pub_date', 'pk')),
+            reverse=True,
+        )
+        self.assertEqual(
+            [pk for page in pages for pk in page],
+            [pk for _, pk in expected],
+        )
+
+    @override_settings(FOLLOW_MERGE_MAX_BUILDS=1)
+    def test_missing_timelines_are_built_gradually(self):
+        keys = [timeline_key(author.pk) for author in self.authors[:2]]
+        self.assertEqual(self.page(), self.expected())
+        self.assertEqual(len(cache.get_many(keys)), 1)
+        self.assertEqual(self.page(), self.expected())
+        self.assertEqual(len(cache.get_many(keys)), 2)
+
+    @override_settings(AUTHOR_TIMELINE_LENGTH=1)
+    def test_fallback_orders_same_date_posts_like_timelines(self):
+        Post.objects.filter(author__in=self.authors[:2]).update(
+            pub_date=timezone.now()
+        )
+        self.page()
+        for number in (1, 2, 3):
+            self.assertEqual(self.page(number), self.expected(number))
+
+    @override_settings(FOLLOW_MERGE_MAX_BUILDS=0)
+    def test_sql_feed_does_not_list_followed_ids(self):
+        """Подписок больше, чем SQLite принимает параметров в запросе."""
+        Follow.objects.bulk_create(
+            Follow(user=self.user, author=User.objects.create_user(
+                username=f'quiet{i}'
+            )) for i in range(20)
+        )
+        connection.ensure_connection()
+        limit = sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER
+        previous = connection.connection.setlimit(limit, 10)
+        try:
+            self.assertEqual(self.page(2), self.expected(2))
+        finally:
+            connection.connection.setlimit(limit, previous)
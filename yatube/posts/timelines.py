@@ -0,0 +1,175 @@
+"""Лента подписок слиянием кешированных лент авторов.
+
+Для каждого автора в кеше лежат id его последних
+``AUTHOR_TIMELINE_LENGTH`` видимых горячих постов с отметками
+``pub_date`` (плоский ``array('q')``: отметка, id, отметка, id...).
+Страница ленты подписок собирается из них k-путевым слиянием на куче:
+одно ``cache.get_many`` по авторам и один запрос постов по id вместо
+сортировки всех постов всех авторов.
+
+Изменение поста удаляет ленту его автора (см. ``posts.signals``), и
+она перестраивается запросом при следующем чтении. Если страница
+уходит дальше обрезанной ленты какого-то автора или глубже
+``FOLLOW_MERGE_MAX_DEPTH``, срез берётся из обычного SQL; архивные
+посты, как и в ``TieredPostList``, дочитываются после горячих, а
+страницы с возвращёнными из архива постами тоже берутся из SQL.
+
+Ленты строятся по запросу на автора, поэтому за одно чтение строится
+не больше ``FOLLOW_MERGE_MAX_BUILDS`` лент: после сброса кеша
+страница читается из SQL, пока ленты не накопятся за несколько
+запросов.
+"""
+import heapq
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Post
+
+
+def timeline_key(author_id):
+    return f'author_timeline:{author_id}'
+
+
+def stamp(moment):
+    return int(moment.timestamp() * 1e6)
+
+
+def build(author_id):
+    """Лента автора: ``(полная ли, array)`` из одного запроса.
+
+    Читается из primary: лента с отстающей реплики осталась бы в кеше
+    после сброса.
+    """
+    length = settings.AUTHOR_TIMELINE_LENGTH
+    rows = Post.objects.using(DEFAULT_DB_ALIAS).filter(
+        author_id=author_id, is_hidden=False
+    ).order_by('-pub_date', '-pk').values_list('pub_date', 'pk')[:length + 1]
+    entries = array('q')
+    for pub_date, pk in rows[:length]:
+        entries.extend((stamp(pub_date), pk))
+    return len(rows) <= length, entries
+
+
+def author_timelines(author_ids):
+    """Ленты авторов ``author_ids`` или None, если часть не построена.
+
+    Недостающие строятся, не больше ``FOLLOW_MERGE_MAX_BUILDS`` за раз,
+    и кладутся в кеш одним ``set_many``.
+    """
+    keys = {timeline_key(author_id): author_id for author_id in author_ids}
+    cached = cache.get_many(keys)
+    missing = [key for key in keys if key not in cached]
+    built = {
+        key: build(keys[key])
+        for key in missing[:settings.FOLLOW_MERGE_MAX_BUILDS]
+    }
+    if built:
+        cache.set_many(built, settings.AUTHOR_TIMELINE_TIMEOUT)
+    if len(built) < len(missing):
+        return None
+    cached.update(built)
+    return list(cached.values())
+
+
+def changed(author_id):
+    """Сбрасывает ленту автора сейчас и ещё раз после коммита."""
+    cache.delete(timeline_key(author_id))
+    transaction.on_commit(lambda: cache.delete(timeline_key(author_id)))
+
+
+def merge(timelines, stop):
+    """Первые ``stop`` id из лент по убыванию ``(pub_date, id)``.
+
+    None, если ответ не определяется лентами: обрезанная лента
+    кончилась раньше, чем набралось ``stop`` id.
+    """
+    heap = [
+        (-entries[0], -entries[1], index, 0)
+        for index, (_, entries) in enumerate(timelines) if entries
+    ]
+    heapq.heapify(heap)
+    ids = []
+    while heap and len(ids) < stop:
+        _, negative_pk, index, position = heapq.heappop(heap)
+        ids.append(-negative_pk)
+        complete, entries = timelines[index]
+        position += 2
+        if position < len(entries):
+            heapq.heappush(heap, (
+                -entries[position], -entries[position + 1], index, position
+            ))
+        elif not complete and len(ids) < stop:
+            return None
+    return ids
+
+
+class MergedTimeline:
+    """Лента подписок для Paginator поверх ``TieredPostList``.
+
+    ``fallback`` — та же лента из SQL в порядке ``-pub_date, -pk``: из
+    неё берутся число постов и срезы, которые нельзя собрать из
+    кешированных лент.
+    """
+
+    def __init__(self, author_ids, fallback):
+        self.author_ids = author_ids
+        self.fallback = fallback
+        self._timelines = None
+        self._loaded = False
+
+    def timelines(self):
+        if not self._loaded:
+            self._loaded = True
+            self._timelines = author_timelines(self.author_ids)
+            if self._timelines is not None and all(
+                complete for complete, _ in self._timelines
+            ):
+                # Полные ленты — это все горячие посты авторов.
+                self.fallback._hot_count = sum(
+                    len(entries) // 2 for _, entries in self._timelines
+                )
+        return self._timelines
+
+    def count(self):
+        self.timelines()
+        return self.fallback.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step:
+            return self.fallback[index]
+        start = index.start or 0
+        stop = index.stop
+        if stop is None or stop > settings.FOLLOW_MERGE_MAX_DEPTH:
+            return self.fallback[index]
+        timelines = self.timelines()
+        if timelines is None:
+            # Часть лент ещё не построена.
+            return self.fallback[index]
+        merged = merge(timelines, stop)
+        if merged is None:
+            # Страница заходит за обрезанную ленту автора.
+            return self.fallback[index]
+        stale = {pk for _, pk in self.fallback.stale()}
+        if stale.intersection(merged):
+            # Возвращённые из архива посты сливаются с архивом.
+            return self.fallback[index]
+        ids = merged[start:]
+        posts = Post.objects.filter(
+            pk__in=ids, is_hidden=False
+        ).select_related('author', 'group').in_bulk()
+        if len(posts) < len(ids):
+            # Пост удалили, а лента ещё не сброшена.
+            return self.fallback[index]
+        items = [posts[pk] for pk in ids]
+        if len(merged) < stop:
+            # Горячие посты кончились, дальше — архив.
+            items.extend(self.fallback.cold[
+                max(start - len(merged), 0):stop - len(merged)
+            ])
+        return items
@@ -13,7 +13,10 @@ urlpatterns = [
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments, name='post_comments'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/batch/', views.follow_batch, name='follow_batch'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,10 +1,22 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404, redirect, render
-
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_POST
+
+from core.edge import edge_shell
+from core.ratelimit import rate_limit
+from core.shortcuts import render
+from core.writes import run_write
+
+from . import follows
+from .archive import get_post, hot_instance, tiered_posts, write_hot
+from .cards import prefetch_cards
+from .comments import comment_page, save_reply
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
+from .models import Follow, Group, User
+from .timelines import MergedTimeline
 
 
 def paginator(list, request):
@@ -14,50 +26,85 @@ def paginator(list, request):
     return {'page_obj': page_obj}
 
 
+def feed(list, request):
+    """Страница ленты с готовыми карточками постов из кеша."""
+    context = paginator(list, request)
+    context['post_cards'] = prefetch_cards(context['page_obj'])
+    return context
+
+
+@edge_shell
 def index(request):
-    post_list = Post.objects.all()
-    context = paginator(post_list, request)
-    return render(request, 'posts/index.html', context)
+    post_list = tiered_posts()
+    return render(
+        request, 'posts/index.html',
+        deferred=lambda: feed(post_list, request),
+    )
 
 
+@edge_shell
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    post_list = tiered_posts(group=group)
     context = {
         'group': group,
     }
-    context.update(paginator(post_list, request))
-    return render(request, 'posts/group_list.html', context)
+    return render(
+        request, 'posts/group_list.html', context,
+        deferred=lambda: feed(post_list, request),
+    )
 
 
+@edge_shell
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    following = request.user.is_authenticated and Follow.objects.filter(
-        author=author,
-        user=request.user
-    ).exists()
+    post_list = tiered_posts(author=author)
     context = {
         'author': author,
-        'following': following,
     }
-    context.update(paginator(post_list, request))
-    return render(request, 'posts/profile.html', context)
+    return render(
+        request, 'posts/profile.html', context,
+        deferred=lambda: paginator(post_list, request),
+    )
 
 
+@edge_shell
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post__id=post_id)
-    form = CommentForm(request.POST or None)
+    post = get_post(post_id)
+
+    def comments():
+        comments, next_cursor = comment_page(post)
+        return {
+            # Как на странице профиля: горячие посты и архив.
+            'author_post_count': tiered_posts(
+                author_id=post.author_id
+            ).count(),
+            'comments': comments,
+            'next_cursor': next_cursor,
+        }
+    return render(
+        request, 'posts/post_detail.html', {'post': post}, deferred=comments
+    )
+
+
+@edge_shell
+def post_comments(request, post_id):
+    """Следующая страница комментариев HTML-фрагментом."""
+    post = get_post(post_id)
+    try:
+        comments, next_cursor = comment_page(post, request.GET.get('after'))
+    except ValueError:
+        raise Http404('Неверный курсор.')
     context = {
         'post': post,
-        'form': form,
         'comments': comments,
+        'next_cursor': next_cursor,
     }
-    return render(request, 'posts/post_detail.html', context)
+    return render(request, 'includes/comment_list.html', context)
 
 
 @login_required
+@rate_limit('post_create')
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -66,7 +113,7 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        run_write(post.save)
         return redirect('posts:profile', request.user.username)
     context = {
         'form': form
@@ -76,16 +123,16 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post(post_id)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=hot_instance(post)
     )
-    if form.is_valid():
-        form.save()
+    if request.method == 'POST' and form.is_valid():
+        write_hot(post, form.save)
         return redirect('posts:post_detail', post_id)
     context = {
         'post': post,
@@ -96,39 +143,60 @@ def post_edit(request, post_id):
 
 
 @login_required
+@rate_limit('add_comment')
 def add_comment(request, post_id):
     # Получите пост и сохраните его в переменную post.
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post(post_id)
     form = CommentForm(request.POST or None)
-    if form.is_valid():
+    if request.method == 'POST' and form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
-        comment.post = post
-        comment.save()
+        # Пост может быть ещё в архиве: его вернёт write_hot.
+        comment.post_id = post.pk
+        write_hot(post, save_reply, comment, request.POST.get('parent', ''))
     return redirect('posts:post_detail', post_id)
 
 
 @login_required
 def follow_index(request):
     # информация о текущем пользователе доступна в переменной request.user
-    post_list = Post.objects.filter(author__following__user=request.user)
-    context = paginator(post_list, request)
-    return render(request, 'posts/follow.html', context)
+    author_ids = list(follows.followed_ids(request.user))
+    # Подзапрос вместо списка id: у SQLite предел числа параметров.
+    followed = Follow.objects.filter(user=request.user).values('author_id')
+    post_list = MergedTimeline(
+        author_ids, tiered_posts(author_id__in=followed)
+    )
+    return render(
+        request, 'posts/follow.html',
+        deferred=lambda: feed(post_list, request),
+    )
 
 
 @login_required
+@rate_limit('profile_follow', methods=('GET', 'POST'))
 def profile_follow(request, username):
     following = get_object_or_404(User, username=username)
-    follower = request.user
-    if follower != following:
-        Follow.objects.get_or_create(user=follower, author=following)
+    follows.follow(request.user, following)
     return redirect('posts:profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
     following = get_object_or_404(User, username=username)
-    follower = request.user
-    follow = get_object_or_404(Follow, user=follower, author=following)
-    follow.delete()
+    if not follows.unfollow(request.user, following):
+        raise Http404('Подписки нет.')
     return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+@rate_limit('follow_batch')
+def follow_batch(request):
+    """Подписка и отписка списками имён ``follow`` и ``unfollow``."""
+    follow = request.POST.getlist('follow')
+    unfollow = request.POST.getlist('unfollow')
+    if len(follow) + len(unfollow) > settings.FOLLOW_BATCH_MAX:
+        return HttpResponseBadRequest(
+            f'Не больше {settings.FOLLOW_BATCH_MAX} имён за запрос.'
+        )
+    return JsonResponse(follows.follow_many(request.user, follow, unfollow))
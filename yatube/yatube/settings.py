@@ -46,10 +46,15 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.TemplateProfileMiddleware',
+    'core.middleware.MemoryProfileMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -89,9 +95,30 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Локальная копия SQLite в роли реплики для чтения:
+    # python manage.py sync_sqlite_replica replica
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.sqlite3',
+    #     'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+    #     'TEST': {'MIRROR': 'default'},
+    # },
 }
 
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Алиасы из DATABASES, с которых читают GET-запросы
+DATABASE_REPLICAS = ['replica']
+# Сколько секунд после записи клиент читает только из primary
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 5
+
+# Повторы записи при ``database is locked`` (core.writes)
+WRITE_RETRY_ATTEMPTS = 5
+WRITE_RETRY_BASE_DELAY = 0.05
+WRITE_RETRY_MAX_DELAY = 1.0
+# Пропускать все записи процесса через одного писателя
+WRITE_SINGLE_WRITER = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -135,6 +162,12 @@ MEDIA_URL = '/media/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# Хеши в именах, манифест и .gz-копии при collectstatic (core.storage)
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+# Отдавать собранную статику через core.views.serve_static и без DEBUG
+STATIC_SERVE = False
+STATIC_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -146,6 +179,116 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 PER_PAGE = 10
 
+# Комментариев на странице post_detail и в «Показать ещё» (posts.comments)
+COMMENTS_PER_PAGE = 50
+# Наибольшая глубина ответов (не больше 13: путь ограничен 255 символами)
+COMMENT_MAX_DEPTH = 5
+
+# Лимиты изменяющих запросов по пользователю и IP (core.ratelimit)
+RATE_LIMIT_ENABLED = True
+RATE_LIMITS = {
+    'post_create': {'user': '10/m', 'ip': '30/m'},
+    'add_comment': {'user': '20/m', 'ip': '60/m'},
+    'profile_follow': {'user': '30/m', 'ip': '60/m'},
+    'follow_batch': {'user': '10/m', 'ip': '30/m'},
+    'signup': {'ip': '5/h'},
+}
+# Адреса и сети обратных прокси, которым доверяется X-Forwarded-For
+RATE_LIMIT_TRUSTED_PROXIES = []
+
+# Потоковая отдача страниц posts: шапка до запросов тела
+# (core.shortcuts.render)
+STREAMING_RESPONSES = False
+
+# Публично кешируемая оболочка страниц с ESI-фрагментами (core.edge)
+EDGE_SHELL = False
+EDGE_SHELL_MAX_AGE = 60
+
+# Время жизни HTML карточки поста в кеше (posts.cards), секунды
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Время жизни кеша подписок пользователя (posts.follows), секунды
+FOLLOW_GRAPH_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Рекомендации «на кого подписаться» (posts.recommendations): сколько
+# хранить и показывать на пользователя и сколько подписчиков автора
+# обходить при подсчёте совместных подписок
+SUGGESTIONS_TOP = 20
+SUGGESTIONS_SHOWN = 5
+SUGGESTIONS_FANOUT = 200
+
+# Сколько имён принимает пакетная подписка (posts.views.follow_batch)
+FOLLOW_BATCH_MAX = 100
+
+# Кешированные ленты авторов для ленты подписок (posts.timelines):
+# длина ленты, время жизни и глубина, после которой срез берётся из SQL
+AUTHOR_TIMELINE_LENGTH = 100
+AUTHOR_TIMELINE_TIMEOUT = 60 * 60 * 24
+FOLLOW_MERGE_MAX_DEPTH = 200
+# Сколько лент авторов строить за одно чтение; если не хватает
+# больше, страница берётся из SQL
+FOLLOW_MERGE_MAX_BUILDS = 5
+
+# Размер страницы JSON API по умолчанию и наибольший limit= (api)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Посты старше этого срока переносятся в архив (posts.archive)
+POST_ARCHIVE_AFTER_DAYS = 365
+POST_ARCHIVE_BATCH_SIZE = 500
+# Время жизни кешированного числа архивных постов ленты, секунды
+ARCHIVE_COUNT_TIMEOUT = 60 * 60
+
+# Массовая модерация: размер пачки и запуск из админки в фоне
+# (posts.moderation)
+MODERATION_BATCH_SIZE = 500
+MODERATION_BACKGROUND = True
+
+# Метрики производительности (core.metrics, /metrics)
+METRICS_ENABLED = True
+# Доля замеряемых запросов: 1.0 — все
+METRICS_SAMPLE_RATE = 0.1
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# Токен для заголовка «Authorization: Bearer <токен>»; если задан,
+# проверяется вместо адреса (нужен за обратным прокси)
+METRICS_TOKEN = ''
+
+# Журнал медленных запросов (core.slow_queries); None — выключен
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 1.0
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.log')
+
+# Профиль шаблонов по заголовку X-Template-Profile (только для отладки)
+TEMPLATE_PROFILING = False
+TEMPLATE_PROFILING_LIBRARIES = ['core.templatetags.user_filters']
+
+# Профиль памяти (core.memory): для всех запросов или по заголовку
+# X-Memory-Profile, значение которого должно совпасть с токеном
+MEMORY_PROFILING = False
+MEMORY_PROFILING_HEADER = False
+MEMORY_PROFILING_TOKEN = ''
+MEMORY_PROFILING_FRAMES = 1
+MEMORY_PROFILING_TOP = 10
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 CACHES = {
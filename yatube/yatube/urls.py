@@ -16,7 +16,9 @@ Including another URLconf
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import fragment, metrics, serve_static
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
@@ -24,8 +26,21 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/', include('api.urls', namespace='api')),
+    path('metrics', metrics, name='metrics'),
+    path('fragments/<slug:name>/', fragment, name='fragment'),
 ]
 
+# Собранная статика без веб-сервера (core.views.serve_static)
+if settings.DEBUG or settings.STATIC_SERVE:
+    urlpatterns += [
+        re_path(
+            r'^{}(?P<path>.+)$'.format(settings.STATIC_URL.lstrip('/')),
+            serve_static,
+            name='static',
+        ),
+    ]
+
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 